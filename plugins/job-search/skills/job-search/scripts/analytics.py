@@ -2,56 +2,250 @@
 Compute job search analytics from memory/analytics/ files.
 Shows conversion rates, time-in-stage, and trends.
 
+Time-in-stage comes from the stage-transition log that pipeline.py writes
+(memory/analytics/transitions.jsonl, see transitions.py).
+
 Usage:
-    python scripts/analytics.py [workspace_dir] [--format md|json]
+    python scripts/analytics.py [workspace_dir] [--format md|json] [--no-cache]
+    python scripts/analytics.py [workspace_dir] --trend weekly|monthly [--periods 12] [--format md|json]
+    python scripts/analytics.py [workspace_dir] --trend trailing [--days 30] [--periods 6] [--format md|json]
+
+Tracker rows are loaded into columns (interned category codes and an int
+array for days_active) and every distribution is counted from those, with
+numpy when it is installed.
+
+Per-file aggregates are kept in memory/.cache/analytics.json with a
+high-water mark (the byte offset where each table's last counted row ends)
+and a checksum of everything before it. Rows appended to a table are folded
+in on the next run; if anything before the mark changed, that file is
+recounted from scratch. --no-cache always recounts. The aggregates include
+per-day row counts, which --trend sums into rolling windows (see trends.py).
+The tracker table is the first one outside a file's `## Stats` block; the
+Stats bullets themselves are reported as "Recorded Stats".
 """
+import os
 import re
 import sys
 import json
+import time
+import hashlib
+from array import array
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import numpy as np
+except ImportError:  # counts are identical without numpy, just slower
+    np = None
+
+from disk_cache import is_fresh
+from mddoc import Document
+from mdtable import read_table
+from pipeline_archive import archive_dir_for, read_index
+from pipeline_journal import write_atomic
+from transitions import time_in_stage
+from trends import SERIES, render_markdown, trend_series
+
+# Categorical application columns and the value used when the column is missing
+APPLICATION_CATEGORIES = {"source": "Unknown", "method": "Unknown", "stage_reached": "Unknown", "outcome": ""}
+ACTIVE_OUTCOMES = {"active", ""}
+CLOSED_OUTCOMES = {"rejected", "closed", "withdrawn"}
+# Tracker tables: (categorical columns, numeric columns) aggregated for each
+# ("date" counts rows per day: the buckets behind --trend)
+TRACKERS = {
+    "applications": ({**APPLICATION_CATEGORIES, "date": ""}, ["days_active"]),
+    "interviews": ({"date": ""}, []),
+    "offers": ({"decision": "", "date": ""}, []),
+    "briefings": ({}, []),
+}
+AGGREGATES_FORMAT = 5
+# Table lines directly following the high-water mark
+TABLE_TAIL = re.compile(rb"(?:\n[ \t]*\|[^\n]*)*")
+
+
+def _columns(headers, rows):
+    """Column-wise table from row lists; cells are interned, so repeated categories share one string."""
+    cells = zip(*rows) if rows else [()] * len(headers)
+    return {"rows": len(rows), "columns": {h: list(map(sys.intern, column)) for h, column in zip(headers, cells)}}
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 0
+
+
+def _factorize(values):
+    """(labels in first-seen order, array('i') of codes into them)."""
+    labels = list(dict.fromkeys(values))
+    index = {label: code for code, label in enumerate(labels)}
+    return labels, array("i", map(index.__getitem__, values))
+
+
+def load_columns(table, categories, numeric=()):
+    """Typed columnar view of a table from _columns().
+
+    Each categorical field becomes array('i') codes into a label list
+    (labels in first-seen order); numeric fields become array('i') with 0
+    for blank or invalid cells. Only distinct strings are converted, so
+    loading stays cheap for years of history.
+    """
+    n = table["rows"]
+    columns = table["columns"]
+    labels, codes, numbers = {}, {}, {}
+    for name, default in categories.items():
+        labels[name], codes[name] = _factorize(columns.get(name) or [default] * n)
+    for name in numeric:
+        distinct, column = _factorize(columns.get(name) or [0] * n)
+        values = array("i", (max(min(_to_int(v), 2**31 - 1), -2**31) for v in distinct))
+        numbers[name] = array("i", map(values.__getitem__, column))
+    return {"rows": n, "labels": labels, "codes": codes, "numbers": numbers}
+
+
+def distributions(columns):
+    """{field: {label: count}} for every categorical column."""
+    result = {}
+    for name, labels in columns["labels"].items():
+        if np is not None:
+            counts = np.bincount(np.frombuffer(columns["codes"][name], dtype=np.intc),
+                                 minlength=len(labels)).tolist()
+        else:
+            tally = Counter(columns["codes"][name])
+            counts = [tally[code] for code in range(len(labels))]
+        result[name] = dict(zip(labels, counts))
+    return result
+
+
+def positive_total(values):
+    """(sum, count) of the values above zero."""
+    if np is not None:
+        arr = np.frombuffer(values, dtype=np.intc)
+        positive = arr[arr > 0]
+        return int(positive.sum()), len(positive)
+    positive = [v for v in values if v > 0]
+    return sum(positive), len(positive)
+
+
+def count_labels(dist, wanted):
+    """Total count of labels whose lowercase form is in `wanted`."""
+    return sum(n for label, n in dist.items() if label.lower() in wanted)
+
+
+def aggregate(table, categories, numeric):
+    """Running totals for a parsed table: row count, label counts, positive sums."""
+    columns = load_columns(table, categories, numeric)
+    return {
+        "rows": table["rows"],
+        "counts": distributions(columns),
+        "sums": {name: list(positive_total(columns["numbers"][name])) for name in numeric},
+    }
+
+
+def merge_aggregates(total, delta):
+    total["rows"] += delta["rows"]
+    for name, counts in delta["counts"].items():
+        target = total["counts"].setdefault(name, {})
+        for label, n in counts.items():
+            target[label] = target.get(label, 0) + n
+    for name, (value, count) in delta["sums"].items():
+        target = total["sums"].setdefault(name, [0, 0])
+        target[0] += value
+        target[1] += count
+    return total
+
+
+def _tracker_table(doc):
+    """(start, end) of the tracker table: the first table outside the `## Stats` block."""
+    for start, end, section in doc.tables:
+        if section is None or doc.sections[section][0] != "stats":
+            return start, end
+    return None
+
+
+def _full_count(data, categories, numeric):
+    """Aggregate the tracker table of `data` from scratch; returns its state (without the file stamp)."""
+    doc = Document(data)
+    table = _tracker_table(doc)
+    if table is None:
+        return {"headers": [], "hwm": 0, "prefix_sha256": None, "stats": doc.stats(),
+                "aggregate": aggregate(_columns([], []), categories, numeric)}
+    start, end = table
+    headers, rows = read_table(doc.text(start, end).split("\n"))
+    return {"headers": headers, "hwm": end, "prefix_sha256": hashlib.sha256(data[:end]).hexdigest(),
+            "stats": doc.stats(), "aggregate": aggregate(_columns(headers, rows), categories, numeric)}
+
+
+def _update_file(path, state, categories, numeric):
+    """Bring one tracker's state up to date: reuse, fold in appended rows, or recount."""
+    st = os.stat(path)
+    if state and is_fresh(path, state, st):
+        return state
+
+    stamped_ns = time.time_ns()
+    data = Path(path).read_bytes()
+    hwm = state["hwm"] if state else 0
+    if (state and state["headers"] and len(data) >= hwm
+            and hashlib.sha256(data[:hwm]).hexdigest() == state["prefix_sha256"]):
+        tail = TABLE_TAIL.match(data, hwm)
+        if tail.end() > hwm:
+            lines = data[hwm:tail.end()].decode("utf-8").split("\n")
+            _, rows = read_table(lines, state["headers"])
+            merge_aggregates(state["aggregate"], aggregate(_columns(state["headers"], rows), categories, numeric))
+            state["hwm"] = tail.end()
+            state["prefix_sha256"] = hashlib.sha256(data[:tail.end()]).hexdigest()
+        state["stats"] = Document(data).stats()
+    else:
+        state = _full_count(data, categories, numeric)
+    state.update(mtime_ns=st.st_mtime_ns, size=st.st_size, sha256=hashlib.sha256(data).hexdigest(),
+                 stamped_ns=stamped_ns)
+    return state
+
+
+def load_aggregates(analytics_dir, use_cache=True, stats=None):
+    """{tracker: aggregate} for memory/analytics/*.md, folding in only rows appended since the last run.
+
+    If `stats` is a dict, it is filled with each tracker's `## Stats` bullets.
+    """
+    cache_file = Path(analytics_dir).parent / ".cache" / "analytics.json"
+    stored, raw = {}, None
+    if use_cache:
+        try:
+            raw = cache_file.read_text()
+            cached = json.loads(raw)
+            if cached.get("format") == AGGREGATES_FORMAT:
+                stored = cached["files"]
+        except (OSError, ValueError):
+            pass
 
-def parse_analytics_table(path):
-    """Parse a markdown table into list of dicts."""
-    if not path.exists():
-        return []
-    text = path.read_text()
-    rows = []
-    headers = []
-    header_found = False
-
-    for line in text.split("\n"):
-        line = line.strip()
-        if not line or line.startswith("#"):
-            if header_found and not line:
-                break  # End of table
+    result, files = {}, {}
+    for name, (categories, numeric) in TRACKERS.items():
+        path = Path(analytics_dir) / f"{name}.md"
+        if not path.exists():
+            result[name] = aggregate(_columns([], []), categories, numeric)
             continue
-
-        if "|" in line:
-            parts = [p.strip() for p in line.split("|")]
-            # Remove empty strings from split
-            parts = [p for p in parts if p]
-
-            if not headers and parts:
-                headers = [h.lower().replace(" ", "_") for h in parts]
-                header_found = True
-                continue
-
-            # Skip separator line
-            if header_found and all(c in "-| " for c in line):
-                continue
-
-            if header_found and parts:
-                row = {}
-                for i, h in enumerate(headers):
-                    row[h] = parts[i] if i < len(parts) else ""
-                rows.append(row)
-
-    return rows
+        state = stored.get(name)
+        if state is not None and state.get("source") != os.path.abspath(path):
+            state = None
+        state = _update_file(path, state, categories, numeric)
+        state["source"] = os.path.abspath(path)
+        files[name] = state
+        result[name] = state["aggregate"]
+        if stats is not None and state["stats"]:
+            stats[name] = state["stats"]
+
+    text = json.dumps({"format": AGGREGATES_FORMAT, "files": files})
+    if text != raw:
+        try:
+            cache_file.parent.mkdir(exist_ok=True)
+            write_atomic(cache_file, text)
+        except OSError:
+            pass  # only costs a recount on the next run
+    return result
 
 
-def compute_analytics(workspace_dir=None, fmt="md"):
+def compute_analytics(workspace_dir=None, fmt="md", use_cache=True):
     """Compute and display job search analytics."""
     if workspace_dir is None:
         workspace_dir = "."
@@ -63,52 +257,37 @@ def compute_analytics(workspace_dir=None, fmt="md"):
         print("No analytics directory found. Run /job-search:start first.")
         return None
 
-    applications = parse_analytics_table(analytics_dir / "applications.md")
-    interviews = parse_analytics_table(analytics_dir / "interviews.md")
-    offers = parse_analytics_table(analytics_dir / "offers.md")
-    briefings = parse_analytics_table(analytics_dir / "briefings.md")
-
-    # Compute stats
-    total_apps = len(applications)
-    active_apps = len([a for a in applications if a.get("outcome", "").lower() in ["active", ""]])
-    closed_apps = len([a for a in applications if a.get("outcome", "").lower() in ["rejected", "closed", "withdrawn"]])
-    interview_count = len(interviews)
-    offer_count = len(offers)
-    accepted_offers = len([o for o in offers if o.get("decision", "").lower() == "accepted"])
+    recorded = {}
+    aggregates = load_aggregates(analytics_dir, use_cache, recorded)
+    applications = aggregates["applications"]
+    interviews = aggregates["interviews"]
+    offers = aggregates["offers"]
+    briefings = aggregates["briefings"]
+    archive = read_index(archive_dir_for(workspace / "PIPELINE.md"))["segments"]
+    archived = sum(s["count"] for s in archive.values())
+    stage_times = time_in_stage(workspace, use_cache)
+
+    # Compute stats from the running aggregates
+    app_dist = applications["counts"]
+    decisions = offers["counts"]["decision"]
+
+    total_apps = applications["rows"]
+    active_apps = count_labels(app_dist["outcome"], ACTIVE_OUTCOMES)
+    closed_apps = count_labels(app_dist["outcome"], CLOSED_OUTCOMES)
+    interview_count = interviews["rows"]
+    offer_count = offers["rows"]
+    accepted_offers = count_labels(decisions, {"accepted"})
 
     # Conversion rates
     app_to_interview = (interview_count / total_apps * 100) if total_apps > 0 else 0
     interview_to_offer = (offer_count / interview_count * 100) if interview_count > 0 else 0
     app_to_offer = (offer_count / total_apps * 100) if total_apps > 0 else 0
 
-    # Stage distribution from applications
-    stage_dist = {}
-    for app in applications:
-        stage = app.get("stage_reached", "Unknown")
-        stage_dist[stage] = stage_dist.get(stage, 0) + 1
-
-    # Source distribution
-    source_dist = {}
-    for app in applications:
-        source = app.get("source", "Unknown")
-        source_dist[source] = source_dist.get(source, 0) + 1
-
-    # Method distribution
-    method_dist = {}
-    for app in applications:
-        method = app.get("method", "Unknown")
-        method_dist[method] = method_dist.get(method, 0) + 1
-
-    # Average days active
-    days_active_list = []
-    for app in applications:
-        try:
-            days = int(app.get("days_active", 0))
-            if days > 0:
-                days_active_list.append(days)
-        except (ValueError, TypeError):
-            pass
-    avg_days = sum(days_active_list) / len(days_active_list) if days_active_list else 0
+    stage_dist = app_dist["stage_reached"]
+    source_dist = app_dist["source"]
+    method_dist = app_dist["method"]
+    days_total, days_count = applications["sums"]["days_active"]
+    avg_days = days_total / days_count if days_count else 0
 
     if fmt == "json":
         result = {
@@ -127,7 +306,11 @@ def compute_analytics(workspace_dir=None, fmt="md"):
             "stage_distribution": stage_dist,
             "source_distribution": source_dist,
             "method_distribution": method_dist,
-            "briefings_generated": len(briefings),
+            "briefings_generated": briefings["rows"],
+            "archived_entries": archived,
+            "archived_by_month": {name[9:16]: s["count"] for name, s in sorted(archive.items())},
+            "time_in_stage": stage_times,
+            "recorded_stats": recorded,
         }
         print(json.dumps(result, indent=2))
         return result
@@ -152,6 +335,15 @@ def compute_analytics(workspace_dir=None, fmt="md"):
 - Applications -> Offers: {app_to_offer:.1f}%
 """
 
+    if stage_times:
+        report += "\n## Time in Stage\n"
+        for stage, t in stage_times.items():
+            if t["count"]:
+                report += f"- {stage}: median {t['median_days']:.1f}d, p90 {t['p90_days']:.1f}d ({t['count']} moves out)"
+            else:
+                report += f"- {stage}: no moves out yet"
+            report += f", {t['current']} there now\n" if t["current"] else "\n"
+
     if source_dist:
         report += "\n## Sources\n"
         for source, count in sorted(source_dist.items(), key=lambda x: x[1], reverse=True):
@@ -164,6 +356,12 @@ def compute_analytics(workspace_dir=None, fmt="md"):
             pct = count / total_apps * 100 if total_apps > 0 else 0
             report += f"- {method}: {count} ({pct:.0f}%)\n"
 
+    if recorded:
+        report += "\n## Recorded Stats\n"
+        for name, values in recorded.items():
+            bullets = ", ".join(f"{key.replace('_', ' ').capitalize()}: {value}" for key, value in values.items())
+            report += f"- {name.capitalize()}: {bullets}\n"
+
     report += "\n## Recommendations\n"
     if total_apps == 0:
         report += "- No applications yet. Run `/job-search:find` to discover roles.\n"
@@ -183,8 +381,33 @@ def compute_analytics(workspace_dir=None, fmt="md"):
         ref_key = next(m for m in method_dist if m.lower() == "referral")
         report += f"- Referrals: {method_dist[ref_key]} used. Referrals typically have 3-5x higher conversion.\n"
 
-    report += f"\n## Activity\n- Briefings generated: {len(briefings)}\n"
+    report += f"\n## Activity\n- Briefings generated: {briefings['rows']}\n"
+    if archived:
+        report += f"- Archived closed pipeline entries: {archived} (since {min(s['first'] for s in archive.values())})\n"
+
+    print(report)
+    return report
+
+
+def compute_trends(workspace_dir=None, period="weekly", periods=None, days=30, fmt="md", use_cache=True):
+    """Funnel counts and conversion over rolling windows (weekly, monthly or trailing N days)."""
+    workspace = Path(workspace_dir or ".")
+    analytics_dir = workspace / "memory" / "analytics"
+    if not analytics_dir.exists():
+        print("No analytics directory found. Run /job-search:start first.")
+        return None
 
+    aggregates = load_aggregates(analytics_dir, use_cache)
+    date_counts = {name: aggregates[name]["counts"].get("date", {}) for name in SERIES}
+    if periods is None:
+        periods = 6 if period == "trailing" else 12
+    series = trend_series(date_counts, period, periods, datetime.now().date(), days)
+
+    if fmt == "json":
+        result = {"period": period, "days": days if period == "trailing" else None, "series": series}
+        print(json.dumps(result, indent=2))
+        return result
+    report = render_markdown(series, period, datetime.now().strftime("%B %d, %Y"))
     print(report)
     return report
 
@@ -192,6 +415,9 @@ def compute_analytics(workspace_dir=None, fmt="md"):
 if __name__ == "__main__":
     workspace = None
     fmt = "md"
+    trend = None
+    periods = None
+    days = 30
     args = sys.argv[1:]
     skip_next = False
     for i, arg in enumerate(args):
@@ -201,7 +427,19 @@ if __name__ == "__main__":
         if arg == "--format" and i + 1 < len(args):
             fmt = args[i + 1]
             skip_next = True
+        elif arg == "--trend" and i + 1 < len(args):
+            trend = args[i + 1]
+            skip_next = True
+        elif arg == "--periods" and i + 1 < len(args):
+            periods = int(args[i + 1])
+            skip_next = True
+        elif arg == "--days" and i + 1 < len(args):
+            days = int(args[i + 1])
+            skip_next = True
         elif not arg.startswith("--"):
             workspace = arg
 
-    compute_analytics(workspace, fmt)
+    if trend:
+        compute_trends(workspace, trend, periods, days, fmt, use_cache="--no-cache" not in args)
+    else:
+        compute_analytics(workspace, fmt, use_cache="--no-cache" not in args)
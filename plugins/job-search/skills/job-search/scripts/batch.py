@@ -0,0 +1,165 @@
+"""
+Refresh many job-search workspaces in one run: briefing, analytics and memory sync.
+
+Every directory under ROOT that holds a PIPELINE.md or JOBSEARCH.md is a
+workspace (nested directories inside a workspace are not searched). The
+workspaces are spread across a process pool, so the scripts are imported once
+per worker instead of once per workspace and job.
+
+Usage:
+    python scripts/batch.py ROOT [--workers 8] [--jobs briefing,analytics,memory_sync] [--out summary.json] [--no-cache]
+
+--no-cache makes every job parse its sources afresh (no workspace snapshot,
+no analytics aggregates). The combined JSON summary goes to --out (or
+stdout). A job that raises is recorded with its error under that workspace
+and the run carries on; the exit status is 1 if any job failed.
+"""
+import io
+import os
+import sys
+import json
+import time
+import traceback
+import multiprocessing
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+from pipeline_journal import write_atomic
+
+JOBS = ["briefing", "analytics", "memory_sync"]
+MARKERS = ["PIPELINE.md", "JOBSEARCH.md"]
+SKIP_DIRS = {"memory", "applications", "node_modules", "__pycache__"}
+
+
+def find_workspaces(root):
+    """Workspace directories under `root` (including root itself), sorted."""
+    found = []
+    pending = [Path(root)]
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        if any(e.name in MARKERS and e.is_file() for e in entries):
+            found.append(str(directory))
+            continue
+        pending.extend(Path(e.path) for e in entries
+                       if e.is_dir(follow_symlinks=False) and not e.name.startswith(".") and e.name not in SKIP_DIRS)
+    return sorted(found)
+
+
+def _briefing(workspace, use_cache):
+    from briefing import generate_briefing
+    if not (Path(workspace) / "PIPELINE.md").exists():
+        return None
+    result = generate_briefing(str(Path(workspace) / "PIPELINE.md"), "json", use_cache=use_cache)
+    return {k: v for k, v in result.items() if k != "entries"}
+
+
+def _analytics(workspace, use_cache):
+    from analytics import compute_analytics
+    return compute_analytics(workspace, "json", use_cache)
+
+
+def _memory_sync(workspace, use_cache):
+    from memory_sync import rebuild_claude_md
+    result = rebuild_claude_md(workspace, use_cache=use_cache)
+    return {k: v for k, v in result.items() if k != "sections"}
+
+
+RUNNERS = {"briefing": _briefing, "analytics": _analytics, "memory_sync": _memory_sync}
+
+
+def run_workspace(task):
+    """Run the jobs for one workspace; each job's failure is caught and reported separately."""
+    workspace, jobs, use_cache = task
+    report = {"workspace": workspace, "ok": True, "jobs": {}}
+    for name in jobs:
+        started = time.perf_counter()
+        try:
+            with redirect_stdout(io.StringIO()):  # the scripts print their reports
+                result = RUNNERS[name](workspace, use_cache)
+            outcome = {"status": "ok" if result is not None else "skipped", "result": result}
+        except Exception as exc:
+            outcome = {"status": "failed", "error": f"{type(exc).__name__}: {exc}",
+                       "traceback": traceback.format_exc(limit=5)}
+            report["ok"] = False
+        outcome["seconds"] = round(time.perf_counter() - started, 3)
+        report["jobs"][name] = outcome
+    return report
+
+
+def run_batch(root, jobs=None, workers=None, use_cache=True):
+    """Combined summary of `jobs` over every workspace under `root`."""
+    jobs = jobs or JOBS
+    workspaces = find_workspaces(root)
+    workers = max(1, min(workers or multiprocessing.cpu_count(), len(workspaces) or 1))
+    started = time.perf_counter()
+    tasks = [(w, jobs, use_cache) for w in workspaces]
+
+    results = []
+    with multiprocessing.Pool(workers) as pool:
+        for report in pool.imap_unordered(run_workspace, tasks):
+            results.append(report)
+            if not report["ok"]:
+                failed = [n for n, j in report["jobs"].items() if j["status"] == "failed"]
+                print(f"  failed: {report['workspace']} ({', '.join(failed)})", file=sys.stderr)
+    results.sort(key=lambda r: r["workspace"])
+
+    elapsed = time.perf_counter() - started
+    failed = sum(not r["ok"] for r in results)
+    print(f"Refreshed {len(results)} workspaces in {elapsed:.2f}s ({failed} with failures, "
+          f"{workers} workers)", file=sys.stderr)
+    return {
+        "root": os.path.abspath(root),
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "jobs": jobs,
+        "workspaces": len(results),
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    root = None
+    workers = None
+    jobs = None
+    out = None
+    use_cache = True
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        if args[i] == "--workers":
+            workers = int(args[i + 1])
+            i += 2
+        elif args[i] == "--jobs":
+            jobs = [j.strip() for j in args[i + 1].split(",") if j.strip()]
+            i += 2
+        elif args[i] == "--out":
+            out = args[i + 1]
+            i += 2
+        elif args[i] == "--no-cache":
+            use_cache = False
+            i += 1
+        else:
+            root = args[i]
+            i += 1
+
+    if root is None:
+        print(__doc__)
+        sys.exit(1)
+    unknown = [j for j in jobs or [] if j not in RUNNERS]
+    if unknown:
+        print(f"Error: unknown job(s) {', '.join(unknown)} (choose from {', '.join(JOBS)})", file=sys.stderr)
+        sys.exit(1)
+
+    summary = run_batch(root, jobs, workers, use_cache)
+    text = json.dumps(summary, indent=2, ensure_ascii=False)
+    if out:
+        write_atomic(out, text + "\n")
+    else:
+        print(text)
+    sys.exit(1 if summary["failed"] else 0)
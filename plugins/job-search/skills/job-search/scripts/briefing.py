@@ -3,46 +3,38 @@ Generate a job search briefing from PIPELINE.md.
 Shows pipeline status, follow-ups due, upcoming interviews, and pending offers.
 
 Usage:
-    python scripts/briefing.py [pipeline_path] [--format md|json]
+    python scripts/briefing.py [pipeline_path] [--format md|json] [--fields id,title,stage] [--no-cache]
+
+--fields picks the keys kept for each entry in the JSON briefing (id, title,
+stage, completed, raw); `--fields ""` leaves the entry list out entirely.
+--no-cache parses PIPELINE.md without the workspace snapshot.
 """
 import re
 import sys
 import json
 from datetime import datetime
-from pathlib import Path
+
+from snapshot import load_part
 
 STAGES = ["Discovered", "Researching", "Applied", "Phone Screen", "Interview", "Offer", "Declined / Rejected"]
+TITLE_BOLD = re.compile(r"\*\*(.+?)\*\*")
 
-def parse_pipeline(path):
-    text = Path(path).read_text()
+def parse_pipeline(path, use_cache=True):
+    """Pipeline entries for the briefing, read from the shared workspace snapshot."""
     entries = []
-    current_stage = None
-
-    for line in text.split("\n"):
-        stage_match = re.match(r"^## (.+)$", line.strip())
-        if stage_match:
-            stage_name = stage_match.group(1).strip()
-            if stage_name in STAGES:
-                current_stage = stage_name
-            continue
-
-        if line.strip().startswith("- [") and current_stage:
-            raw = line.strip()
-            completed = "[x]" in raw
-            title_match = re.search(r"\*\*(.+?)\*\*", raw)
-            title = title_match.group(1) if title_match else raw[6:50]
-
-            entries.append({
-                "title": title,
-                "stage": current_stage,
-                "completed": completed,
-                "raw": raw,
-            })
-
+    for entry in load_part(path, "pipeline", use_cache):
+        title_match = TITLE_BOLD.search(entry["raw"])
+        entries.append({
+            "id": entry["id"],
+            "title": title_match.group(1) if title_match else entry["raw"][6:50],
+            "stage": entry["stage"],
+            "completed": entry["completed"],
+            "raw": entry["raw"],
+        })
     return entries
 
-def generate_briefing(pipeline_path, fmt="md"):
-    entries = parse_pipeline(pipeline_path)
+def generate_briefing(pipeline_path, fmt="md", fields=None, use_cache=True):
+    entries = parse_pipeline(pipeline_path, use_cache)
     today = datetime.now()
 
     active = [e for e in entries if e["stage"] != "Declined / Rejected"]
@@ -66,8 +58,10 @@ def generate_briefing(pipeline_path, fmt="md"):
                 "interviews_upcoming": len(interviews),
                 "followups_needed": len(applied),
             },
-            "entries": entries,
+            "entries": entries if fields is None else [{f: e.get(f) for f in fields} for e in entries],
         }
+        if fields == []:
+            del result["entries"]
         print(json.dumps(result, indent=2))
         return result
 
@@ -134,6 +128,8 @@ def generate_briefing(pipeline_path, fmt="md"):
 if __name__ == "__main__":
     path = "PIPELINE.md"
     fmt = "md"
+    fields = None
+    use_cache = True
     args = sys.argv[1:]
     skip_next = False
     for i, arg in enumerate(args):
@@ -143,7 +139,12 @@ if __name__ == "__main__":
         if arg == "--format" and i + 1 < len(args):
             fmt = args[i + 1]
             skip_next = True
+        elif arg == "--fields" and i + 1 < len(args):
+            fields = [f.strip() for f in args[i + 1].split(",") if f.strip()]
+            skip_next = True
+        elif arg == "--no-cache":
+            use_cache = False
         elif not arg.startswith("--"):
             path = arg
 
-    generate_briefing(path, fmt)
+    generate_briefing(path, fmt, fields, use_cache)
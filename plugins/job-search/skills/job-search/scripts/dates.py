@@ -0,0 +1,31 @@
+"""
+Loose date parsing for the dates people type into the workspace files
+(deadlines, last-contact notes, tracker rows). Kept free of the other
+scripts' imports so light readers like trends.py can use it.
+"""
+import re
+from datetime import date, datetime
+
+DATE_TEXT = re.compile(r"(\d{4})-(\d{2})-(\d{2})|\b([A-Za-z]{3})[a-z]* (\d{1,2})\b(?:,? (\d{4}))?")
+
+
+def parse_date(text, today, past=False):
+    """First date in "2026-10-22", "Oct 22" or "October 22, 2026" form.
+
+    Yearless dates take the nearest year, or with `past` the latest one not after today.
+    """
+    for m in DATE_TEXT.finditer(text or ""):
+        try:
+            if m.group(1):
+                return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+            month = datetime.strptime(m.group(4).title(), "%b").month
+            day = int(m.group(5))
+            if m.group(6):
+                return date(int(m.group(6)), month, day)
+            candidates = [date(today.year + d, month, day) for d in (-1, 0, 1)]
+            if past:
+                return max(c for c in candidates if c <= today)
+            return min(candidates, key=lambda c: abs((c - today).days))
+        except ValueError:
+            continue
+    return None
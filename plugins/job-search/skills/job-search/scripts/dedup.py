@@ -0,0 +1,194 @@
+"""
+De-duplicate job postings gathered from several sources (LinkedIn, Naukri, company sites).
+
+Near-duplicates are found with MinHash signatures of the title and
+description and LSH banding within each company, so a batch is processed in
+roughly linear time instead of comparing every pair. Postings of different
+companies, or with different URLs, are never merged. Within each cluster the
+richest listing (most non-empty fields) is kept and the other sources are
+recorded under "alternates".
+
+Usage:
+    python scripts/dedup.py postings.jsonl [--format csv] [--threshold 0.6] > unique.jsonl
+    cat postings.jsonl | python scripts/dedup.py - | python scripts/match_score.py --profile JOBSEARCH.md --batch -
+
+Input is JSONL or CSV (same as match_score.py --batch). Output is JSONL of the
+kept postings in input order; a summary is printed on stderr.
+"""
+import re
+import sys
+import json
+import zlib
+import random
+
+from match_score import load_postings
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python signatures are identical, just slower
+    np = None
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+MASK64 = (1 << 64) - 1
+
+# Multiply-shift hash family: h -> ((a * h + b) mod 2**64) >> 32, with odd a
+_rng = random.Random(1729)
+PERMUTATIONS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERM)]
+
+COMPANY_NOISE = re.compile(r"\b(pvt|private|ltd|limited|inc|llc|llp|corp|corporation|technologies|labs)\b")
+NON_WORD = re.compile(r"[^a-z0-9]+")
+DESCRIPTION_FIELDS = ["description", "summary", "jd"]
+
+
+def normalize(text, noise=None):
+    text = str(text or "").lower()
+    if noise is not None:
+        text = noise.sub(" ", text)
+    return NON_WORD.sub(" ", text).strip()
+
+
+def company_key(posting):
+    return normalize(posting.get("company"), COMPANY_NOISE)
+
+
+def url_key(posting):
+    return str(posting.get("url") or "").strip().rstrip("/").lower()
+
+
+def title_grams(posting):
+    title = normalize(posting.get("title"))
+    return {title[i:i + 3] for i in range(max(len(title) - 2, 1))}
+
+
+def shingles(posting):
+    """Character trigrams of the title plus word bigrams of the description (company is the blocking key)."""
+    grams = title_grams(posting)
+
+    body = []
+    for field in DESCRIPTION_FIELDS:
+        body.extend(normalize(posting.get(field)).split())
+    grams.update(" ".join(body[i:i + 2]) for i in range(len(body) - 1))
+    return grams
+
+
+def signatures(shingle_sets, chunk_size=256):
+    """NUM_PERM-long MinHash signature (a tuple) for each shingle set.
+
+    With numpy, each chunk of postings is hashed as one array and reduced per
+    posting; otherwise the same permutations are applied in pure Python.
+    """
+    hashed = [[zlib.crc32(g.encode()) for g in grams] or [0] for grams in shingle_sets]
+    if np is None:
+        return [tuple(min(((a * h + b) & MASK64) >> 32 for h in hashes) for a, b in PERMUTATIONS)
+                for hashes in hashed]
+
+    a = np.array([p[0] for p in PERMUTATIONS], dtype=np.uint64)[:, None]
+    b = np.array([p[1] for p in PERMUTATIONS], dtype=np.uint64)[:, None]
+    result = []
+    for start in range(0, len(hashed), chunk_size):
+        chunk = hashed[start:start + chunk_size]
+        lengths = np.fromiter((len(h) for h in chunk), dtype=np.int64, count=len(chunk))
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        flat = np.fromiter((x for h in chunk for x in h), dtype=np.uint64, count=int(lengths.sum()))
+        mins = np.minimum.reduceat((a * flat + b) >> np.uint64(32), offsets, axis=1)
+        result.extend(map(tuple, mins.T.tolist()))
+    return result
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERM
+
+
+def richness(posting):
+    filled = sum(1 for v in posting.values() if v not in (None, "", [], {}))
+    longest = max((len(str(posting.get(f) or "")) for f in DESCRIPTION_FIELDS), default=0)
+    return filled, longest
+
+
+def find_clusters(postings, threshold=0.6):
+    """Group near-duplicate postings; returns clusters as lists of indices.
+
+    Only postings of the same company are compared, and their titles alone
+    must also reach `threshold` (a shared boilerplate description doesn't
+    make two roles one). Each cluster is led by its first posting, and a
+    posting joins the most similar leader it shares an LSH band with, so
+    clusters never chain into one another. The same URL is always the same
+    posting; different non-empty URLs are never merged.
+    """
+    sigs = signatures([shingles(p) for p in postings])
+    titles = [title_grams(p) for p in postings]
+    clusters = {}  # leader -> member indices
+    cluster_url = {}  # leader -> URL of its members ("" while none has one)
+    by_url = {}
+    buckets = {}  # (company, band, band values) -> leaders
+
+    for i, posting in enumerate(postings):
+        url = url_key(posting)
+        leader = by_url.get(url) if url else None
+        if leader is None:
+            company = company_key(posting)
+            keys = [(company, band, sigs[i][band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+            best = threshold
+            for candidate in sorted({c for key in keys for c in buckets.get(key, ())}):
+                if url and cluster_url[candidate] and cluster_url[candidate] != url:
+                    continue
+                shared = len(titles[candidate] & titles[i])
+                if shared < threshold * len(titles[candidate] | titles[i]):
+                    continue
+                score = similarity(sigs[candidate], sigs[i])
+                if score >= best and (leader is None or score > best):
+                    leader, best = candidate, score
+        if leader is None:
+            leader = i
+            clusters[i], cluster_url[i] = [], ""
+            for key in keys:
+                buckets.setdefault(key, []).append(i)
+        clusters[leader].append(i)
+        if url:
+            by_url.setdefault(url, leader)
+            cluster_url[leader] = cluster_url[leader] or url
+    return list(clusters.values())
+
+
+def dedupe(postings, threshold=0.6):
+    """Return the richest posting from each cluster, in input order."""
+    postings = list(postings)
+    kept = []
+    for members in find_clusters(postings, threshold):
+        best = max(members, key=lambda i: (richness(postings[i]), -i))
+        posting = dict(postings[best])
+        alternates = [postings[i].get("url") or postings[i].get("source")
+                      for i in members if i != best]
+        alternates = [a for a in alternates if a]
+        if alternates:
+            posting["alternates"] = alternates
+        kept.append((best, posting))
+    kept.sort(key=lambda item: item[0])
+    return [p for _, p in kept], len(postings)
+
+
+if __name__ == "__main__":
+    path = "-"
+    fmt = None
+    threshold = 0.6
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        if args[i] == "--format":
+            fmt = args[i + 1]
+            i += 2
+        elif args[i] == "--threshold":
+            threshold = float(args[i + 1])
+            i += 2
+        else:
+            path = args[i]
+            i += 1
+
+    unique, total = dedupe(load_postings(path, fmt), threshold)
+    for posting in unique:
+        sys.stdout.write(json.dumps(posting, ensure_ascii=False) + "\n")
+    print(f"Kept {len(unique)} of {total} postings ({total - len(unique)} duplicates removed)",
+          file=sys.stderr)
@@ -0,0 +1,112 @@
+"""
+On-disk cache for values derived from workspace files (parsed profiles, etc).
+
+Entries live in memory/.cache/<name>.pickle next to the source file and are
+keyed on the source's mtime, size and SHA-256 content hash:
+
+    profile = load_cached("JOBSEARCH.md", "match-profile", parse_profile)
+
+is_fresh() decides whether a stored stamp still describes its source: a
+matching mtime/size is trusted unless the source was modified within
+RACY_WINDOW_NS of the stamp being taken (or of now), since such a stamp can't
+tell a same-size rewrite in the same tick apart; then, as when only the mtime
+moved (touch, checkout), the content hash is compared. The snapshot, the
+pipeline index, the analytics aggregates, the export manifest and mddoc's
+document cache all use it. Workspaces without a memory/ directory are never
+written to.
+"""
+import os
+import pickle
+import time
+import hashlib
+from pathlib import Path
+
+CACHE_FORMAT = 3  # 3: entries carry a file_stamp()
+CHUNK_SIZE = 1 << 20
+# mtimes this recent may not reflect a write made in the same tick; always hash those
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def cache_dir_for(source):
+    """memory/.cache/ of the workspace containing `source`."""
+    return Path(os.path.abspath(source)).parent / "memory" / ".cache"
+
+
+def file_digest(path):
+    """SHA-256 hex digest of the file at `path`, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_stamp(path, st=None):
+    """{"mtime_ns", "size", "sha256", "stamped_ns"} of the file at `path`, for is_fresh()."""
+    stamped_ns = time.time_ns()
+    st = st or os.stat(path)
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": file_digest(path), "stamped_ns": stamped_ns}
+
+
+def is_fresh(path, stamp, st=None):
+    """True if `stamp` (see file_stamp) still describes the file at `path`.
+
+    A matching mtime and size are trusted unless the mtime falls within
+    RACY_WINDOW_NS of when the stamp was taken (or of now); otherwise the
+    content hash decides. When the hash matches, the stamp is refreshed in
+    place, so callers that store it can tell by comparing it afterwards.
+    """
+    st = st or os.stat(path)
+    now = time.time_ns()
+    racy = st.st_mtime_ns >= min(stamp.get("stamped_ns", now), now) - RACY_WINDOW_NS
+    if stamp["mtime_ns"] == st.st_mtime_ns and stamp["size"] == st.st_size and not racy:
+        return True
+    if stamp["sha256"] != file_digest(path):
+        return False
+    stamp.update(mtime_ns=st.st_mtime_ns, size=st.st_size, stamped_ns=now)
+    return True
+
+
+def _read_entry(cache_file):
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+        return None
+
+
+def _write_entry(cache_file, entry):
+    try:
+        cache_file.parent.mkdir(exist_ok=True)
+        tmp = cache_file.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass  # caching is best-effort; a read-only workspace still works
+
+
+def load_cached(source, name, build, version=1):
+    """Return build(source), reusing the cached value while `source` is unchanged.
+
+    `version` is stored with the entry; bump it when `build` changes shape.
+    """
+    source = Path(source)
+    cache_file = cache_dir_for(source) / f"{name}.pickle"
+    st = source.stat()
+    key = (CACHE_FORMAT, version, os.path.abspath(source))
+
+    entry = _read_entry(cache_file)
+    if entry is not None and entry.get("key") == key:
+        stamped_ns = entry["stamped_ns"]
+        if is_fresh(source, entry, st):
+            if entry["stamped_ns"] != stamped_ns:
+                _write_entry(cache_file, entry)
+            return entry["value"]
+    elif not cache_file.parent.parent.is_dir():
+        return build(source)
+
+    stamp = file_stamp(source, st)  # before build(), so a concurrent edit can't hide behind the new hash
+    value = build(source)
+    _write_entry(cache_file, {"key": key, **stamp, "value": value})
+    return value
@@ -4,72 +4,250 @@ Collects resume, cover letter, outreach drafts, research, and fit analysis.
 
 Usage:
     python scripts/export_materials.py --company "Razorpay" --role "Senior PM" \
-        [--workspace .] [--output ./exports/razorpay-senior-pm]
+        [--workspace .] [--output ./exports/razorpay-senior-pm] [--incremental] [--link] [--workers 8]
+    python scripts/export_materials.py --company "Razorpay" --role "Senior PM" \
+        --archive razorpay.zip|razorpay.tar.gz|- [--archive-format zip|tar.gz] [--level 6]
+    python scripts/export_materials.py --all|--stage Applied,Interview [--workspace .] [--output ./exports] \
+        [--incremental] [--link] [--archive-format zip|tar.gz]
+
+Files are copied on a thread pool, through os.copy_file_range / sendfile
+where the OS supports them. The export folder keeps a manifest
+(.export-manifest.json) of each file's source, size, mtime and sha256;
+with --incremental, files whose source hasn't changed since the last export
+are left alone (recently modified sources are hashed, not trusted by mtime).
+--link hardlinks files instead of copying them when source and export are on
+the same filesystem. Files dropped from the package since the last export are
+removed either way.
+
+--archive streams the package into a single zip or tar.gz (a file, or "-"
+for stdout) without staging a folder: each file is read and compressed in
+fixed-size chunks, so memory use doesn't grow with the attachments. Files
+that are already compressed (PDFs, images, Office documents) are stored in
+zips as-is. The format comes from the file extension, or --archive-format
+when writing to stdout; --level sets the compression level (0-9, default 6).
+
+--all exports a package for every open PIPELINE.md entry ("Role — Company"),
+--stage for the entries in the given stages (which may include Declined /
+Rejected). PIPELINE.md is read once and memory/ is scanned once into an
+index, so the work grows with files + entries rather than their product.
+Application folders and contact files match a company when its name appears
+as whole hyphen-separated words in the file name ("acme-corp-senior-pm"
+matches "Acme Corp", "co30-recruiter.md" doesn't match "Co3"). Each package
+goes to <output>/<company>-<role>/, or <output>/<company>-<role>.zip|.tar.gz
+with --archive-format.
 """
+import io
 import os
+import re
 import sys
-import shutil
 import json
+import time
+import gzip
+import shutil
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
-def export_materials(company, role, workspace=".", output=None):
-    workspace = Path(workspace)
-    slug = f"{company.lower().replace(' ', '-')}-{role.lower().replace(' ', '-')}"
+from disk_cache import file_stamp, is_fresh
+from pipeline_journal import write_atomic
 
-    if output is None:
-        output = workspace / "exports" / slug
-    else:
-        output = Path(output)
+MANIFEST_NAME = ".export-manifest.json"
+CHUNK_SIZE = 1 << 20
+ARCHIVE_FORMATS = {".zip": "zip", ".tar.gz": "tar.gz", ".tgz": "tar.gz"}
+COMPRESSED_SUFFIXES = {".pdf", ".png", ".jpg", ".jpeg", ".gif", ".zip", ".gz", ".docx", ".pptx", ".xlsx", ".mp4"}
+NAME_WORD = re.compile(r"[a-z0-9]+")
+# CLI options accepted by each mode (as keyword arguments)
+PACKAGE_OPTIONS = {"company", "role", "workspace", "output", "incremental", "link", "workers",
+                   "archive", "archive_format", "level"}
+BULK_OPTIONS = {"workspace", "output", "incremental", "link", "workers", "archive_format", "level"}
+
+
+def name_key(text):
+    """Words of a company or file name joined by "-" ("Acme Corp." -> "acme-corp")."""
+    return "-".join(NAME_WORD.findall(text.lower()))
+
+
+def _word_runs(name):
+    """Every run of consecutive words in a file name, as name_key() strings."""
+    words = NAME_WORD.findall(name.lower())
+    return {"-".join(words[i:j]) for i in range(len(words)) for j in range(i + 1, len(words) + 1)}
+
+
+def _scan(directory):
+    """Sorted os.DirEntry list of a directory ([] if it doesn't exist); no stat calls needed."""
+    try:
+        with os.scandir(directory) as it:
+            return sorted(it, key=lambda e: e.name)
+    except OSError:
+        return []
+
+
+def _files_in(directory):
+    return [Path(e.path) for e in _scan(directory) if e.is_file()]
+
+
+def index_memory(workspace="."):
+    """One scan of memory/companies, applications and contacts, keyed for company lookups.
 
-    output.mkdir(parents=True, exist_ok=True)
+    Application folders are listed only when a package uses them.
+    """
+    memory = Path(workspace) / "memory"
+    index = {"companies": {e.name for e in _scan(memory / "companies")},
+             "applications": {}, "application_words": {}, "contact_words": {}}
+    for e in _scan(memory / "applications"):
+        if e.is_dir():
+            index["applications"][e.name] = e.path
+            for run in _word_runs(e.name):
+                index["application_words"].setdefault(run, e.name)
+    for e in _scan(memory / "contacts"):
+        if e.is_file():
+            for run in _word_runs(e.name):
+                index["contact_words"].setdefault(run, []).append(e.path)
+    return index
 
-    collected = []
+
+def collect_materials(company, role, workspace=".", index=None):
+    """([(source path, exported name)], [missing items]) for one application package.
+
+    `index` is an index_memory() of the workspace, shared when exporting many packages.
+    """
+    workspace = Path(workspace)
+    index = index or index_memory(workspace)
+    slug = f"{company.lower().replace(' ', '-')}-{role.lower().replace(' ', '-')}"
+    key = name_key(company)
+    files = []
     missing = []
 
     # 1. Company research
     company_slug = company.lower().replace(" ", "-")
-    research_path = workspace / "memory" / "companies" / f"{company_slug}.md"
-    if research_path.exists():
-        shutil.copy2(research_path, output / "company_research.md")
-        collected.append("company_research.md")
+    if f"{company_slug}.md" in index["companies"]:
+        files.append((workspace / "memory" / "companies" / f"{company_slug}.md", "company_research.md"))
     else:
         missing.append("Company research (run /research first)")
 
-    # 2. Application materials
-    app_dir = workspace / "memory" / "applications" / slug
-    if app_dir.exists():
-        for f in app_dir.iterdir():
-            shutil.copy2(f, output / f.name)
-            collected.append(f.name)
-    else:
-        # Check without exact slug match
-        apps_dir = workspace / "memory" / "applications"
-        if apps_dir.exists():
-            for d in apps_dir.iterdir():
-                if company.lower() in d.name.lower():
-                    for f in d.iterdir():
-                        shutil.copy2(f, output / f.name)
-                        collected.append(f.name)
-                    break
-        if not collected or collected == ["company_research.md"]:
-            missing.append("Application materials (run /apply first)")
+    # 2. Application materials (exact slug first, else the first folder naming the company)
+    app_dir = slug if slug in index["applications"] else index["application_words"].get(key) if key else None
+    app_files = _files_in(index["applications"][app_dir]) if app_dir is not None else []
+    files.extend((f, f.name) for f in app_files)
+    if not app_files:
+        missing.append("Application materials (run /apply first)")
 
     # 3. Contact info
-    contacts_dir = workspace / "memory" / "contacts"
-    if contacts_dir.exists():
-        for f in contacts_dir.iterdir():
-            if company.lower() in f.name.lower():
-                shutil.copy2(f, output / f"contact_{f.name}")
-                collected.append(f"contact_{f.name}")
+    if key:
+        files.extend((Path(f), f"contact_{Path(f).name}") for f in index["contact_words"].get(key, []))
 
     # 4. JOBSEARCH.md profile (for reference)
     profile = workspace / "JOBSEARCH.md"
     if profile.exists():
-        shutil.copy2(profile, output / "my_profile.md")
-        collected.append("my_profile.md")
+        files.append((profile, "my_profile.md"))
 
-    # 5. Generate index
+    return files, missing
+
+
+def _read_manifest(output):
+    try:
+        with open(output / MANIFEST_NAME, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _unchanged(stored, source, st, dest):
+    """True if `dest` still holds the export of `source` recorded in `stored` (refreshing its stamp)."""
+    if not stored or stored["source"] != os.path.abspath(source):
+        return False
+    try:
+        if os.stat(dest).st_size != st.st_size:
+            return False
+    except OSError:
+        return False
+    return is_fresh(source, stored, st)
+
+
+def _copy_data(src, dst):
+    """Copy file contents in the kernel where possible: copy_file_range, then sendfile, then read/write."""
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        size = os.fstat(fin.fileno()).st_size
+        copied = 0
+        if hasattr(os, "copy_file_range"):
+            try:
+                while copied < size:
+                    n = os.copy_file_range(fin.fileno(), fout.fileno(), size - copied)
+                    if n == 0:
+                        break
+                    copied += n
+            except OSError:
+                pass  # e.g. EXDEV on older kernels; fall through from where it stopped
+        if copied < size and hasattr(os, "sendfile"):
+            try:
+                while copied < size:
+                    n = os.sendfile(fout.fileno(), fin.fileno(), copied, size - copied)
+                    if n == 0:
+                        break
+                    copied += n
+            except OSError:
+                pass
+        fin.seek(copied)
+        fout.seek(copied)
+        shutil.copyfileobj(fin, fout, CHUNK_SIZE)
+
+
+def copy_file(src, dst, link=False):
+    """Replace `dst` with `src` (a hardlink if `link` and possible), never leaving a partial file."""
+    tmp = dst.with_name(f".{dst.name}.tmp{os.getpid()}")
+    try:
+        if link:
+            try:
+                os.link(src, tmp)
+                os.replace(tmp, dst)
+                return
+            except OSError:
+                pass  # cross-device or unsupported: copy instead
+        _copy_data(src, tmp)
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+
+
+def sync_files(files, output, incremental=False, link=False, workers=None):
+    """Copy [(source, name)] into `output` on a thread pool; returns (copied names, unchanged names)."""
+    manifest = _read_manifest(output)
+    before = json.dumps(manifest, indent=2, sort_keys=True)
+    files = list({name: (source, name) for source, name in files}.values())  # a later name wins, as before
+    wanted = {name for _, name in files}
+    for name in set(manifest) - wanted:
+        try:
+            os.unlink(output / name)
+        except OSError:
+            pass
+        del manifest[name]
+
+    def sync(item):
+        source, name = item
+        st = os.stat(source)
+        if incremental and _unchanged(manifest.get(name), source, st, output / name):
+            return name, False
+        stamp = file_stamp(source, st)
+        copy_file(source, output / name, link)
+        manifest[name] = {"source": os.path.abspath(source), **stamp}
+        return name, True
+
+    copied, unchanged = [], []
+    with ThreadPoolExecutor(workers) as pool:
+        for name, was_copied in pool.map(sync, files):
+            (copied if was_copied else unchanged).append(name)
+
+    text = json.dumps(manifest, indent=2, sort_keys=True)
+    if text != before:
+        write_atomic(output / MANIFEST_NAME, text)
+    return copied, unchanged
+
+
+def render_index(company, role, collected, missing):
     index_content = f"""# Application Package: {role} @ {company}
 
 **Exported:** {datetime.now().strftime("%B %d, %Y")}
@@ -84,35 +262,209 @@ def export_materials(company, role, workspace=".", output=None):
         index_content += f"\n## Missing (run these commands)\n\n"
         for m in missing:
             index_content += f"- {m}\n"
+    return index_content
+
+
+def archive_format_for(target, fmt=None):
+    """"zip" or "tar.gz" for an archive target, from `fmt` or the file extension."""
+    if fmt:
+        if fmt not in ARCHIVE_FORMATS.values():
+            raise ValueError(f"Unknown archive format: {fmt} (choose zip or tar.gz)")
+        return fmt
+    for suffix, name in ARCHIVE_FORMATS.items():
+        if str(target).lower().endswith(suffix):
+            return name
+    raise ValueError(f"Can't tell the archive format of {target}; pass --archive-format zip|tar.gz")
+
+
+def _write_zip(out, root, files, index_content, level):
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED if level else zipfile.ZIP_STORED,
+                         compresslevel=level or None) as zf:
+        for source, name in files:
+            stored = Path(name).suffix.lower() in COMPRESSED_SUFFIXES
+            zf.write(source, f"{root}/{name}", zipfile.ZIP_STORED if stored else None)
+        zf.writestr(f"{root}/INDEX.md", index_content)
+
+
+def _write_tar(out, root, files, index_content, level):
+    with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=level, mtime=0) as gz, \
+            tarfile.open(fileobj=gz, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+        for source, name in files:
+            tar.add(source, f"{root}/{name}", recursive=False)
+        data = index_content.encode("utf-8")
+        info = tarfile.TarInfo(f"{root}/INDEX.md")
+        info.size, info.mtime, info.mode = len(data), int(time.time()), 0o644
+        tar.addfile(info, io.BytesIO(data))
+
+
+def write_archive(target, fmt, root, files, index_content, level=6):
+    """Stream [(source, name)] plus INDEX.md into a zip or tar.gz at `target` ("-" for stdout)."""
+    writer = _write_zip if fmt == "zip" else _write_tar
+    if target == "-":
+        writer(sys.stdout.buffer, root, files, index_content, level)
+        sys.stdout.buffer.flush()
+        return
+    target = Path(target)
+    tmp = target.with_name(f".{target.name}.tmp{os.getpid()}")
+    try:
+        with open(tmp, "wb") as out:
+            writer(out, root, files, index_content, level)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, target)
+    finally:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
 
-    (output / "INDEX.md").write_text(index_content)
+
+def export_package(company, role, workspace=".", output=None, incremental=False, link=False, workers=None,
+                   archive=None, archive_format=None, level=6, index=None):
+    """Build one package (folder or archive) without printing; returns what was collected."""
+    workspace = Path(workspace)
+    slug = f"{company.lower().replace(' ', '-')}-{role.lower().replace(' ', '-')}"
+
+    files, missing = collect_materials(company, role, workspace, index)
+    collected = [name for _, name in files]
+    # 5. Generate index
+    index_content = render_index(company, role, collected, missing)
+    copied, unchanged = [], []
+
+    if archive is not None:
+        fmt = archive_format_for(archive, archive_format)
+        write_archive(archive, fmt, slug, files, index_content, level)
+        output = "stdout" if archive == "-" else archive
+    else:
+        output = workspace / "exports" / slug if output is None else Path(output)
+        output.mkdir(parents=True, exist_ok=True)
+        copied, unchanged = sync_files(files, output, incremental, link, workers)
+        index_path = output / "INDEX.md"
+        if not index_path.exists() or index_path.read_text() != index_content:
+            index_path.write_text(index_content)
     collected.append("INDEX.md")
 
-    print(f"Application Package: {role} @ {company}")
-    print(f"Exported to: {output}")
-    print(f"\nCollected {len(collected)} files:")
+    return {"company": company, "role": role, "output": str(output), "collected": collected,
+            "missing": missing, "copied": copied, "unchanged": unchanged}
+
+
+def export_materials(company, role, workspace=".", output=None, incremental=False, link=False, workers=None,
+                     archive=None, archive_format=None, level=6):
+    result = export_package(company, role, workspace, output, incremental, link, workers,
+                            archive, archive_format, level)
+    collected, missing = result["collected"], result["missing"]
+
+    report = sys.stderr if archive == "-" else sys.stdout  # stdout carries the archive
+    print(f"Application Package: {role} @ {company}", file=report)
+    print(f"Exported to: {result['output']}", file=report)
+    if archive is not None:
+        print(f"\nCollected {len(collected)} files:", file=report)
+    else:
+        print(f"\nCollected {len(collected)} files ({len(result['copied'])} copied, "
+              f"{len(result['unchanged'])} unchanged):", file=report)
     for f in collected:
-        print(f"  ✓ {f}")
+        print(f"  ✓ {f}", file=report)
     if missing:
-        print(f"\nMissing {len(missing)} items:")
+        print(f"\nMissing {len(missing)} items:", file=report)
         for m in missing:
-            print(f"  ✗ {m}")
+            print(f"  ✗ {m}", file=report)
+
+    return result
+
+
+def export_pipeline(workspace=".", stages=None, output=None, incremental=False, link=False, workers=None,
+                    archive_format=None, level=6):
+    """Export a package for every PIPELINE.md entry in `stages` (default: all but Declined / Rejected)."""
+    from pipeline import CLOSED_STAGE, iter_pipeline
+    from pipeline_index import split_title
+
+    workspace = Path(workspace)
+    root = workspace / "exports" if output is None else Path(output)
+    root.mkdir(parents=True, exist_ok=True)
+    index = index_memory(workspace)
+    packages, skipped = [], []
+
+    for entry in iter_pipeline(workspace / "PIPELINE.md"):
+        if (entry["stage"] not in stages) if stages else entry["stage"] == CLOSED_STAGE:
+            continue
+        role, company = split_title(entry["title"])
+        if not company:
+            skipped.append(entry["title"])
+            continue
+        slug = f"{company.lower().replace(' ', '-')}-{role.lower().replace(' ', '-')}"
+        if archive_format:
+            suffix = "zip" if archive_format == "zip" else "tar.gz"
+            result = export_package(company, role, workspace, archive=root / f"{slug}.{suffix}",
+                                    archive_format=archive_format, level=level, index=index)
+        else:
+            result = export_package(company, role, workspace, root / slug, incremental, link, workers, index=index)
+        result["stage"] = entry["stage"]
+        packages.append(result)
 
-    return {"output": str(output), "collected": collected, "missing": missing}
+    print(f"Exported {len(packages)} application packages to {root}")
+    for p in packages:
+        changed = "" if archive_format else f", {len(p['copied'])} copied"
+        print(f"  ✓ {p['role']} @ {p['company']} ({p['stage']}) — {len(p['collected'])} files{changed}")
+        for m in p["missing"]:
+            print(f"      ✗ {m}")
+    for title in skipped:
+        print(f"  ✗ {title} — no company in the title (expected \"Role — Company\")")
+
+    return {"output": str(root), "packages": packages, "skipped": skipped}
 
 if __name__ == "__main__":
     kwargs = {}
     args = sys.argv[1:]
     i = 0
     while i < len(args):
-        if args[i].startswith("--"):
+        if args[i] in ("--incremental", "--link", "--all"):
+            kwargs[args[i][2:]] = True
+            i += 1
+        elif args[i] in ("--workers", "--level"):
+            kwargs[args[i][2:]] = int(args[i + 1])
+            i += 2
+        elif args[i] == "--archive-format":
+            kwargs["archive_format"] = args[i + 1]
+            i += 2
+        elif args[i].startswith("--"):
             kwargs[args[i][2:]] = args[i + 1]
             i += 2
         else:
             i += 1
 
+    bulk = kwargs.pop("all", False) or "stage" in kwargs
+    unsupported = sorted(set(kwargs) - (BULK_OPTIONS | {"stage"} if bulk else PACKAGE_OPTIONS))
+    if unsupported:
+        options = ", ".join("--" + k.replace("_", "-") for k in unsupported)
+        if not bulk:
+            print(f"Error: unknown option {options}", file=sys.stderr)
+        else:
+            hint = " (use --archive-format for one archive per entry)" if "archive" in unsupported else ""
+            print(f"Error: {options} can't be used with --all/--stage{hint}", file=sys.stderr)
+        sys.exit(1)
+
+    if bulk:
+        from pipeline import resolve_stages
+        try:
+            stages = resolve_stages(kwargs.pop("stage").split(",")) if "stage" in kwargs else None
+            if "archive_format" in kwargs:
+                archive_format_for("-", kwargs["archive_format"])
+        except ValueError as exc:
+            print(f"Error: {exc}", file=sys.stderr)
+            sys.exit(1)
+        export_pipeline(stages=stages, **kwargs)
+        sys.exit(0)
+
     if "company" not in kwargs or "role" not in kwargs:
-        print("Usage: python export_materials.py --company 'X' --role 'Y' [--workspace .] [--output path]")
+        print("Usage: python export_materials.py --company 'X' --role 'Y' [--workspace .] [--output path] "
+              "[--incremental] [--link] [--workers N] [--archive path|- [--archive-format zip|tar.gz] [--level N]]")
+        print("       python export_materials.py --all|--stage S1,S2 [--workspace .] [--output dir] "
+              "[--incremental] [--link] [--archive-format zip|tar.gz]")
         sys.exit(1)
 
+    if "archive" in kwargs:
+        try:
+            archive_format_for(kwargs["archive"], kwargs.get("archive_format"))
+        except ValueError as exc:
+            print(f"Error: {exc}", file=sys.stderr)
+            sys.exit(1)
+
     export_materials(**kwargs)
@@ -76,7 +76,7 @@ def init_workspace(workspace_dir=None):
 ## Offer
 
 ## Declined / Rejected
-""")
+""", encoding="utf-8")
         created.append("PIPELINE.md")
     else:
         skipped.append("PIPELINE.md (already exists)")
@@ -6,15 +6,47 @@ Usage:
         --company "Razorpay" --industry "Fintech" --location "Bangalore" \
         --comp "₹45L" --stage "Series F" --remote "hybrid"
 
+    python scripts/match_score.py --profile JOBSEARCH.md --title "Senior PM" --quiet
+    python scripts/match_score.py --profile JOBSEARCH.md --batch postings.jsonl
+    cat postings.csv | python scripts/match_score.py --profile JOBSEARCH.md --batch - --format csv
+    python scripts/match_score.py --profile JOBSEARCH.md --batch postings.jsonl --engine columnar [--verify]
+    python scripts/match_score.py --profile JOBSEARCH.md --batch dump.jsonl --workers 8 [--chunk-size 2000]
+
 Returns a match score (0-100) with breakdown and deal-breaker flags.
+The parsed profile is cached under memory/.cache/ (--no-cache to bypass).
+Batch mode parses the profile once and streams one JSON result per posting;
+a JSONL line that doesn't parse is skipped and reported on stderr.
+--quiet skips the human-readable breakdown and prints the result as JSON.
+--engine columnar scores the whole batch as NumPy arrays (requires numpy);
+--verify re-scores every posting with score_job and fails on any difference.
+--workers shards the batch across a process pool; results keep input order and
+throughput (postings/sec) is reported on stderr.
 """
 import re
 import sys
+import csv
 import json
-from pathlib import Path
+import time
+import multiprocessing
+from collections import deque
+from itertools import islice
+
+from matcher import PatternMatcher
+from disk_cache import load_cached
+from mddoc import load_document
+from snapshot import load_part
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the columnar engine
+    np = None
+
+POSTING_FIELDS = ["title", "company", "industry", "location", "comp", "stage", "remote"]
+COLUMNS = {"title": "titles", "company": "companies", "industry": "industries",
+           "location": "locations", "comp": "comps", "stage": "stages"}
 
 def parse_profile(profile_path):
-    text = Path(profile_path).read_text()
+    doc = load_document(profile_path)
     profile = {
         "titles": [],
         "industries": [],
@@ -27,85 +59,109 @@ def parse_profile(profile_path):
         "preferences": [],
     }
 
-    current_section = None
-    for line in text.split("\n"):
-        if line.startswith("## "):
-            current_section = line.strip("# ").strip().lower()
-            continue
-
-        if current_section == "target":
-            if "Titles" in line and "|" in line:
-                parts = line.split("|")
-                if len(parts) >= 3:
-                    profile["titles"] = [t.strip() for t in parts[2].split(",") if t.strip()]
-            elif "Industries" in line and "|" in line:
-                parts = line.split("|")
-                if len(parts) >= 3:
-                    profile["industries"] = [t.strip().lower() for t in parts[2].split(",") if t.strip()]
-            elif "Location" in line and "|" in line:
-                parts = line.split("|")
-                if len(parts) >= 3:
-                    profile["locations"] = [t.strip().lower() for t in parts[2].split(",") if t.strip() and t.strip() != "|"]
-            elif "Stage" in line and "|" in line:
-                parts = line.split("|")
-                if len(parts) >= 3:
-                    profile["stage_pref"] = [t.strip().lower() for t in parts[2].split(",") if t.strip()]
-
-        elif current_section == "compensation":
-            if "Base floor" in line and "|" in line:
-                parts = line.split("|")
-                if len(parts) >= 3:
-                    comp_str = parts[2].strip()
-                    numbers = re.findall(r"[\d.]+", comp_str.replace(",", ""))
-                    if numbers:
-                        profile["comp_floor"] = float(numbers[0])
-                    if "$" in comp_str:
-                        profile["comp_currency"] = "USD"
-                    elif "₹" in comp_str:
-                        profile["comp_currency"] = "INR"
-
-        elif current_section == "preferences":
-            if line.strip().startswith("- Avoid:") or "avoid" in line.lower():
-                avoid_items = line.split(":", 1)[-1] if ":" in line else line
-                profile["avoid"] = [a.strip().lower() for a in avoid_items.split(",") if a.strip()]
-
-        elif current_section == "watchlist":
-            if line.strip().startswith("- "):
-                company = line.strip("- ").strip()
-                if company:
-                    profile["watchlist"].append(company.lower())
+    for line in doc.section_lines("target"):
+        if "Titles" in line and "|" in line:
+            parts = line.split("|")
+            if len(parts) >= 3:
+                profile["titles"] = [t.strip() for t in parts[2].split(",") if t.strip()]
+        elif "Industries" in line and "|" in line:
+            parts = line.split("|")
+            if len(parts) >= 3:
+                profile["industries"] = [t.strip().lower() for t in parts[2].split(",") if t.strip()]
+        elif "Location" in line and "|" in line:
+            parts = line.split("|")
+            if len(parts) >= 3:
+                profile["locations"] = [t.strip().lower() for t in parts[2].split(",") if t.strip() and t.strip() != "|"]
+        elif "Stage" in line and "|" in line:
+            parts = line.split("|")
+            if len(parts) >= 3:
+                profile["stage_pref"] = [t.strip().lower() for t in parts[2].split(",") if t.strip()]
+
+    for line in doc.section_lines("compensation"):
+        if "Base floor" in line and "|" in line:
+            parts = line.split("|")
+            if len(parts) >= 3:
+                comp_str = parts[2].strip()
+                numbers = re.findall(r"[\d.]+", comp_str.replace(",", ""))
+                if numbers:
+                    profile["comp_floor"] = float(numbers[0])
+                if "$" in comp_str:
+                    profile["comp_currency"] = "USD"
+                elif "₹" in comp_str:
+                    profile["comp_currency"] = "INR"
+
+    for line in doc.section_lines("preferences"):
+        if line.strip().startswith("- Avoid:") or "avoid" in line.lower():
+            avoid_items = line.split(":", 1)[-1] if ":" in line else line
+            profile["avoid"] = [a.strip().lower() for a in avoid_items.split(",") if a.strip()]
+
+    for line in doc.section_lines("watchlist"):
+        if line.strip().startswith("- "):
+            company = line.strip("- ").strip()
+            if company:
+                profile["watchlist"].append(company.lower())
 
     return profile
 
-def score_job(profile, title="", company="", industry="", location="", comp="", stage="", remote=""):
-    score = 0
-    breakdown = {}
-    deal_breakers = []
+def compile_profile(profile):
+    """Precompute lowercased titles and multi-pattern matchers for score_job.
 
-    # Title match (0-30 points)
+    Build this once per profile when scoring many postings; each posting field
+    is then scanned a single time no matter how long the profile lists are.
+    """
+    return {
+        "titles": [(t.lower(), frozenset(t.lower().split())) for t in profile["titles"]],
+        "industries": PatternMatcher(profile["industries"]),
+        "locations": PatternMatcher(profile["locations"]),
+        "stage_pref": PatternMatcher(profile["stage_pref"]),
+        "avoid": PatternMatcher(profile["avoid"]),
+        "watchlist": frozenset(profile["watchlist"]),
+    }
+
+def title_points(compiled, title):
     title_score = 0
     title_lower = title.lower()
-    for target_title in profile["titles"]:
-        target_lower = target_title.lower()
+    title_words = set(title_lower.split())
+    for target_lower, target_words in compiled["titles"]:
         # Exact match
         if target_lower in title_lower or title_lower in target_lower:
-            title_score = 30
-            break
+            return 30
         # Partial match (shared key words)
-        target_words = set(target_lower.split())
-        title_words = set(title_lower.split())
         overlap = target_words & title_words
         if len(overlap) >= 2:
             title_score = max(title_score, 20)
         elif len(overlap) >= 1:
             title_score = max(title_score, 10)
+    return title_score
+
+def load_profile(profile_path, use_cache=True):
+    """Parsed and compiled profile, cached in memory/.cache/ until JOBSEARCH.md changes."""
+    if not use_cache:
+        profile = parse_profile(profile_path)
+        return profile, compile_profile(profile)
+
+    def build(path):
+        profile = load_part(path, "profile")["match"]
+        return profile, compile_profile(profile)
+    return load_cached(profile_path, "match-profile", build)
+
+def score_job(profile, title="", company="", industry="", location="", comp="", stage="", remote="",
+              verbose=True, compiled=None):
+    if compiled is None:
+        compiled = compile_profile(profile)
+    score = 0
+    breakdown = {}
+    deal_breakers = []
+
+    # Title match (0-30 points)
+    title_score = title_points(compiled, title)
     breakdown["title"] = title_score
     score += title_score
 
     # Industry match (0-20 points)
     industry_score = 0
     industry_lower = industry.lower()
-    if any(ind in industry_lower for ind in profile["industries"]):
+    if compiled["industries"].any(industry_lower):
         industry_score = 20
     elif industry_lower:
         industry_score = 5  # Unknown industry, slight positive for breadth
@@ -115,7 +171,7 @@ def score_job(profile, title="", company="", industry="", location="", comp="",
     # Location match (0-15 points)
     location_score = 0
     location_lower = location.lower()
-    if any(loc in location_lower for loc in profile["locations"]):
+    if compiled["locations"].any(location_lower):
         location_score = 15
     elif "remote" in location_lower:
         location_score = 12  # Remote is usually fine
@@ -155,21 +211,22 @@ def score_job(profile, title="", company="", industry="", location="", comp="",
 
     # Watchlist bonus (0-10 points)
     watchlist_score = 0
-    if company.lower() in profile["watchlist"]:
+    company_lower = company.lower()
+    if company_lower in compiled["watchlist"]:
         watchlist_score = 10
     breakdown["watchlist"] = watchlist_score
     score += watchlist_score
 
     # Avoid list check (deal-breaker)
-    for avoid_term in profile["avoid"]:
-        if avoid_term in industry_lower or avoid_term in company.lower():
-            deal_breakers.append(f"Company/industry matches avoid list: {avoid_term}")
+    for i in compiled["avoid"].matches(industry_lower, company_lower):
+        avoid_term = profile["avoid"][i]
+        deal_breakers.append(f"Company/industry matches avoid list: {avoid_term}")
 
     # Stage match (0-5 points)
     stage_score = 0
     if stage and profile["stage_pref"]:
         stage_lower = stage.lower()
-        if any(s in stage_lower for s in profile["stage_pref"]):
+        if compiled["stage_pref"].any(stage_lower):
             stage_score = 5
     breakdown["stage"] = stage_score
     score += stage_score
@@ -201,32 +258,326 @@ def score_job(profile, title="", company="", industry="", location="", comp="",
         }
     }
 
-    print(f"Match Score: {score}/100 ({match_level})")
-    print(f"\nBreakdown:")
-    for k, v in breakdown.items():
-        bar = "█" * (v // 2) + "░" * ((30 - v) // 2) if v <= 30 else ""
-        print(f"  {k:15s}: {v:3d} pts")
-    if deal_breakers:
-        print(f"\n⚠️  Deal-Breakers:")
-        for db in deal_breakers:
-            print(f"  - {db}")
+    if verbose:
+        print(f"Match Score: {score}/100 ({match_level})")
+        print(f"\nBreakdown:")
+        for k, v in breakdown.items():
+            bar = "█" * (v // 2) + "░" * ((30 - v) // 2) if v <= 30 else ""
+            print(f"  {k:15s}: {v:3d} pts")
+        if deal_breakers:
+            print(f"\n⚠️  Deal-Breakers:")
+            for db in deal_breakers:
+                print(f"  - {db}")
 
     return result
 
+def load_postings(path="-", fmt=None):
+    """Yield posting dicts from a JSONL or CSV file ("-" reads stdin).
+
+    A JSONL line that isn't a JSON object is skipped with a warning on stderr.
+    """
+    if fmt is None:
+        fmt = "csv" if str(path).lower().endswith(".csv") else "jsonl"
+
+    handle = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if fmt == "csv":
+            for row in csv.DictReader(handle):
+                yield {k.strip().lower(): v for k, v in row.items() if k}
+        else:
+            for line_no, line in enumerate(handle, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    posting = json.loads(line)
+                except ValueError as exc:
+                    print(f"Warning: skipping line {line_no}: not valid JSON ({exc})", file=sys.stderr)
+                    continue
+                if not isinstance(posting, dict):
+                    print(f"Warning: skipping line {line_no}: not a JSON object", file=sys.stderr)
+                    continue
+                yield posting
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+def posting_kwargs(posting):
+    """Map a raw posting to score_job keyword arguments (missing fields become "")."""
+    return {f: "" if posting.get(f) is None else str(posting.get(f)) for f in POSTING_FIELDS}
+
+def score_batch(profile, postings, out=None, compiled=None):
+    """Score every posting against one parsed profile, streaming JSONL to `out`."""
+    out = out or sys.stdout
+    compiled = compiled or compile_profile(profile)
+    count = 0
+    for index, posting in enumerate(postings):
+        result = score_job(profile, verbose=False, compiled=compiled, **posting_kwargs(posting))
+        result["index"] = index
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        count += 1
+    out.flush()
+    return count
+
+def _factorize(values):
+    """Return (uniques, codes) so per-value work runs once per distinct string."""
+    seen = {}
+    codes = np.fromiter((seen.setdefault(v, len(seen)) for v in values), dtype=np.int64, count=len(values))
+    return list(seen), codes
+
+def posting_columns(postings):
+    """Turn an iterable of posting dicts into score_columns keyword arguments."""
+    columns = {name: [] for name in COLUMNS.values()}
+    for posting in postings:
+        fields = posting_kwargs(posting)
+        for f, name in COLUMNS.items():
+            columns[name].append(fields[f])
+    return columns
+
+def score_columns(profile, titles, companies=None, industries=None, locations=None, comps=None,
+                  stages=None, compiled=None):
+    """Vectorized score_job over columns of postings (requires numpy).
+
+    Each distinct field value is matched once, then scores, match levels and
+    deal-breaker flags for every row are computed as array operations.
+    Returns a dict of arrays plus per-row deal-breaker message lists.
+    """
+    if np is None:
+        raise RuntimeError("The columnar engine requires numpy (pip install numpy)")
+    if compiled is None:
+        compiled = compile_profile(profile)
+
+    n = len(titles)
+    blank = [""] * n
+    companies, industries = companies or blank, industries or blank
+    locations, comps, stages = locations or blank, comps or blank, stages or blank
+
+    def lookup(column, fn, dtype=np.int64):
+        uniques, codes = column
+        return np.array([fn(u) for u in uniques], dtype=dtype)[codes]
+
+    title_col, industry_col, location_col = _factorize(titles), _factorize(industries), _factorize(locations)
+    comp_col, company_col, stage_col = _factorize(comps), _factorize(companies), _factorize(stages)
+
+    title = lookup(title_col, lambda v: title_points(compiled, v))
+
+    industry = lookup(industry_col, lambda v: 20 if compiled["industries"].any(v.lower()) else (5 if v else 0))
+
+    location = lookup(location_col, lambda v: (
+        15 if compiled["locations"].any(v.lower()) else 12 if "remote" in v.lower() else 3 if v else 0))
+
+    # Compensation: parse each distinct string once, then threshold as arrays
+    floor = profile["comp_floor"]
+    def comp_value(c):
+        numbers = re.findall(r"[\d.]+", c.replace(",", ""))
+        return float(numbers[0]) if numbers and floor else np.nan
+    comp_val = lookup(comp_col, comp_value, dtype=np.float64)
+    has_comp = lookup(comp_col, bool, dtype=bool)
+    comparable = has_comp & ~np.isnan(comp_val)
+    with np.errstate(invalid="ignore"):
+        above = comparable & (comp_val >= (floor or 0))
+        near = comparable & ~above & (comp_val >= (floor or 0) * 0.9)
+    below_floor = comparable & ~above & ~near
+    compensation = np.where(~has_comp, 10, np.where(above, 20, np.where(near, 12, 0)))
+
+    watchlist = lookup(company_col, lambda v: 10 if v.lower() in compiled["watchlist"] else 0)
+
+    if profile["stage_pref"]:
+        stage = lookup(stage_col, lambda v: 5 if v and compiled["stage_pref"].any(v.lower()) else 0)
+    else:
+        stage = np.zeros(n, dtype=np.int64)
+
+    # Avoid list: each distinct industry and company is scanned once
+    avoid = compiled["avoid"]
+    ind_hits = [avoid.matches(v.lower()) for v in industry_col[0]]
+    co_hits = [avoid.matches(v.lower()) for v in company_col[0]]
+    ind_codes, co_codes = industry_col[1], company_col[1]
+    avoid_flag = np.array([bool(h) for h in ind_hits], dtype=bool)[ind_codes] | \
+        np.array([bool(h) for h in co_hits], dtype=bool)[co_codes]
+
+    breakdown = {"title": title, "industry": industry, "location": location,
+                 "compensation": compensation, "watchlist": watchlist, "stage": stage}
+    score = title + industry + location + compensation + watchlist + stage
+    deal_breaker = below_floor | avoid_flag
+    match_level = np.select(
+        [deal_breaker, score >= 75, score >= 50, score >= 30],
+        ["Deal-Breaker", "High", "Medium", "Low"], default="Poor")
+
+    deal_breakers = [[] for _ in range(n)]
+    for i in np.flatnonzero(deal_breaker).tolist():
+        if below_floor[i]:
+            deal_breakers[i].append(f"Comp ({comps[i]}) below floor ({floor})")
+        for j in sorted(set(ind_hits[ind_codes[i]]) | set(co_hits[co_codes[i]])):
+            deal_breakers[i].append(f"Company/industry matches avoid list: {profile['avoid'][j]}")
+
+    return {"score": score, "match_level": match_level, "deal_breaker": deal_breaker,
+            "breakdown": breakdown, "deal_breakers": deal_breakers}
+
+def columnar_results(columns, scored):
+    """Expand score_columns output into score_job-shaped result dicts."""
+    scores = scored["score"].tolist()
+    levels = scored["match_level"].tolist()
+    parts = {k: v.tolist() for k, v in scored["breakdown"].items()}
+    blank = [""] * len(scores)
+    job_cols = [columns.get(COLUMNS[f]) or blank for f in ["title", "company", "industry", "location", "comp"]]
+    for i, score in enumerate(scores):
+        title, company, industry, location, comp = (col[i] for col in job_cols)
+        yield {
+            "score": score,
+            "max_score": 100,
+            "match_level": levels[i],
+            "breakdown": {k: v[i] for k, v in parts.items()},
+            "deal_breakers": scored["deal_breakers"][i],
+            "job": {"title": title, "company": company, "industry": industry,
+                    "location": location, "comp": comp},
+        }
+
+def score_batch_columnar(profile, postings, out=None, verify=False, compiled=None):
+    """Columnar counterpart of score_batch; with verify, cross-check every row against score_job."""
+    out = out or sys.stdout
+    compiled = compiled or compile_profile(profile)
+    postings = list(postings)
+    columns = posting_columns(postings)
+    scored = score_columns(profile, compiled=compiled, **columns)
+    mismatches = 0
+    for index, result in enumerate(columnar_results(columns, scored)):
+        if verify:
+            expected = score_job(profile, verbose=False, compiled=compiled, **posting_kwargs(postings[index]))
+            if expected != result:
+                mismatches += 1
+                print(f"Parity mismatch at posting {index}: {expected} != {result}", file=sys.stderr)
+        result["index"] = index
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    out.flush()
+    if verify:
+        print(f"Parity check: {len(postings) - mismatches}/{len(postings)} postings match score_job",
+              file=sys.stderr)
+    return mismatches
+
+_worker = {}
+
+def _init_worker(profile, compiled, engine):
+    _worker["profile"] = profile
+    _worker["compiled"] = compiled or compile_profile(profile)
+    _worker["engine"] = engine
+
+def _score_chunk(task):
+    """Score one chunk inside a pool worker, returning serialized JSONL lines."""
+    start, postings = task
+    profile, compiled = _worker["profile"], _worker["compiled"]
+    if _worker["engine"] == "columnar":
+        columns = posting_columns(postings)
+        results = columnar_results(columns, score_columns(profile, compiled=compiled, **columns))
+    else:
+        results = (score_job(profile, verbose=False, compiled=compiled, **posting_kwargs(p)) for p in postings)
+    lines = []
+    for offset, result in enumerate(results):
+        result["index"] = start + offset
+        lines.append(json.dumps(result, ensure_ascii=False) + "\n")
+    return lines
+
+def score_parallel(profile, postings, workers=None, chunk_size=1000, engine="row", out=None, compiled=None):
+    """Shard postings across a process pool, writing JSONL results in input order.
+
+    Each worker receives the compiled profile once. At most two chunks per worker are in
+    flight, so memory stays bounded however large the input is.
+    """
+    out = out or sys.stdout
+    workers = workers or multiprocessing.cpu_count()
+    postings = iter(postings)
+    started = time.perf_counter()
+    count = 0
+
+    def chunks():
+        start = 0
+        while True:
+            chunk = list(islice(postings, chunk_size))
+            if not chunk:
+                return
+            yield start, chunk
+            start += len(chunk)
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(profile, compiled, engine)) as pool:
+        pending = deque()
+        tasks = chunks()
+        for task in tasks:
+            pending.append(pool.apply_async(_score_chunk, (task,)))
+            if len(pending) >= workers * 2:
+                lines = pending.popleft().get()
+                out.writelines(lines)
+                count += len(lines)
+        while pending:
+            lines = pending.popleft().get()
+            out.writelines(lines)
+            count += len(lines)
+    out.flush()
+
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed > 0 else 0
+    print(f"Scored {count} postings in {elapsed:.2f}s ({rate:,.0f} postings/sec, "
+          f"{workers} workers, chunk size {chunk_size})", file=sys.stderr)
+    return count
+
 if __name__ == "__main__":
     kwargs = {}
     args = sys.argv[1:]
     i = 0
     profile_path = "JOBSEARCH.md"
+    batch_path = None
+    fmt = None
+    quiet = False
+    engine = "row"
+    verify = False
+    workers = None
+    chunk_size = 1000
+    use_cache = True
     while i < len(args):
         if args[i] == "--profile":
             profile_path = args[i + 1]
             i += 2
+        elif args[i] == "--batch":
+            batch_path = args[i + 1]
+            i += 2
+        elif args[i] == "--format":
+            fmt = args[i + 1]
+            i += 2
+        elif args[i] == "--engine":
+            engine = args[i + 1]
+            i += 2
+        elif args[i] == "--workers":
+            workers = int(args[i + 1])
+            i += 2
+        elif args[i] == "--chunk-size":
+            chunk_size = int(args[i + 1])
+            i += 2
+        elif args[i] == "--quiet":
+            quiet = True
+            i += 1
+        elif args[i] == "--no-cache":
+            use_cache = False
+            i += 1
+        elif args[i] == "--verify":
+            verify = True
+            i += 1
         elif args[i].startswith("--"):
             kwargs[args[i][2:]] = args[i + 1]
             i += 2
         else:
             i += 1
 
-    profile = parse_profile(profile_path)
-    score_job(profile, **kwargs)
+    profile, compiled = load_profile(profile_path, use_cache)
+    if engine == "columnar" and np is None:
+        print("Error: --engine columnar requires numpy (pip install numpy)", file=sys.stderr)
+        sys.exit(1)
+    if batch_path is not None and workers is not None:
+        score_parallel(profile, load_postings(batch_path, fmt), workers, chunk_size, engine,
+                       compiled=compiled)
+    elif batch_path is not None and engine == "columnar":
+        if score_batch_columnar(profile, load_postings(batch_path, fmt), verify=verify, compiled=compiled):
+            sys.exit(1)
+    elif batch_path is not None:
+        score_batch(profile, load_postings(batch_path, fmt), compiled=compiled)
+    elif quiet:
+        print(json.dumps(score_job(profile, verbose=False, compiled=compiled, **kwargs), ensure_ascii=False))
+    else:
+        score_job(profile, compiled=compiled, **kwargs)
@@ -0,0 +1,88 @@
+"""
+Multi-pattern substring matcher (Aho-Corasick) used by match_score.py.
+
+Build once from a list of terms, then scan each posting field a single time
+regardless of how many terms there are:
+
+    avoid = PatternMatcher(["gambling", "crypto", "tobacco"])
+    avoid.any("crypto exchange")       # True
+    avoid.matches("gambling, crypto")  # [0, 1] — indices into the term list
+"""
+from collections import deque
+
+
+class PatternMatcher:
+    """Aho-Corasick automaton over a fixed list of substring patterns.
+
+    `pattern in text` semantics are preserved exactly: an empty pattern matches
+    every text, and duplicate patterns report every index they occupy.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self._always = tuple(i for i, p in enumerate(self.patterns) if p == "")
+
+        outputs = [[]]
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(index)
+
+        # Breadth-first pass: fail links, with outputs merged along the fail chain
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                outputs[nxt].extend(outputs[self._fail[nxt]])
+
+        self._out = [tuple(o) for o in outputs]
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def any(self, text):
+        """True if at least one pattern occurs in `text` (stops at the first hit)."""
+        if self._always:
+            return True
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                return True
+        return False
+
+    def matches(self, *texts):
+        """Sorted indices of every pattern occurring in any of `texts`."""
+        found = set(self._always)
+        goto, fail, out = self._goto, self._fail, self._out
+        for text in texts:
+            state = 0
+            for ch in text:
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(ch, 0)
+                if out[state]:
+                    found.update(out[state])
+        return sorted(found)
@@ -0,0 +1,113 @@
+"""
+Section-offset model of a markdown file, for single-pass access.
+
+A Document scans its bytes once and records where every `## ` section and
+every table (a run of lines starting with `|`) begins and ends. Parsers then
+decode just the slice they need:
+
+    doc = load_document("JOBSEARCH.md")
+    for line in doc.section_lines("compensation"):
+        ...
+
+Section names are matched the way the scripts always have: the header with
+`#`s and spaces stripped, lowercased. load_document() keeps one Document per
+file (until it changes), so several parsers reading the same file share it.
+Table rows and `## Stats` bullets are decoded by mdtable.
+"""
+import os
+import re
+import time
+import hashlib
+from pathlib import Path
+
+from disk_cache import is_fresh
+from mdtable import parse_stats
+
+# `## ` headers and table blocks, found in a single scan
+BLOCKS = re.compile(rb"^(?:(?P<header>## [^\n]*)|(?P<table>[ \t]*\|[^\n]*(?:\n[ \t]*\|[^\n]*)*))", re.M)
+
+_documents = {}
+
+
+def section_key(header):
+    return header.strip("# ").strip().lower()
+
+
+class Document:
+    """Byte offsets of the `## ` sections and tables of one markdown file."""
+
+    def __init__(self, data):
+        self.data = data
+        self.sections = []  # (key, body_start, body_end)
+        self.tables = []  # (start, end, section index or None)
+        for match in BLOCKS.finditer(data):
+            if match.group("header") is not None:
+                if self.sections:
+                    self._close_section(match.start())
+                key = section_key(match.group("header").decode("utf-8", "replace"))
+                self.sections.append((key, min(match.end() + 1, len(data)), len(data)))
+            else:
+                section = len(self.sections) - 1 if self.sections else None
+                self.tables.append((match.start(), match.end(), section))
+
+    def _close_section(self, header_start):
+        key, start, _ = self.sections[-1]
+        self.sections[-1] = (key, start, max(start, header_start - 1))
+
+    @classmethod
+    def open(cls, path):
+        return cls(Path(path).read_bytes())
+
+    def text(self, start, end):
+        return self.data[start:end].decode("utf-8")
+
+    def has_section(self, name):
+        return any(key == name for key, _, _ in self.sections)
+
+    def section_text(self, name):
+        """Body of the first section called `name` ("" if missing)."""
+        for key, start, end in self.sections:
+            if key == name:
+                return self.text(start, end)
+        return ""
+
+    def section_lines(self, name, first_only=False):
+        """Body lines of every section called `name`, in file order."""
+        lines = []
+        for key, start, end in self.sections:
+            if key == name:
+                lines.extend(self.text(start, end).split("\n"))
+                if first_only:
+                    break
+        return lines
+
+    def table_lines(self, index=0, section=None):
+        """Lines of the `index`-th table, counted within `section` if given ([] if none)."""
+        if section is not None:
+            wanted = {i for i, (key, _, _) in enumerate(self.sections) if key == section}
+            tables = [t for t in self.tables if t[2] in wanted]
+        else:
+            tables = self.tables
+        if index >= len(tables):
+            return []
+        start, end, _ = tables[index]
+        return self.text(start, end).split("\n")
+
+    def stats(self, section="stats"):
+        """{key: value} bullets of the `## Stats` block ({} if missing)."""
+        return parse_stats(self.section_text(section))
+
+
+def load_document(path):
+    """Shared Document for `path`, re-read only when the file changes (see disk_cache.is_fresh)."""
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    cached = _documents.get(key)
+    if cached is not None and is_fresh(key, cached[0], st):
+        return cached[1]
+    stamped_ns = time.time_ns()
+    doc = Document.open(key)
+    stamp = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": hashlib.sha256(doc.data).hexdigest(),
+             "stamped_ns": stamped_ns}
+    _documents[key] = (stamp, doc)
+    return doc
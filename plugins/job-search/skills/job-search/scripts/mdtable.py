@@ -0,0 +1,88 @@
+"""
+Markdown table codec for the tracker files (memory/analytics/*.md).
+
+    | Date | Company | Role |      ← header, keys become "date", "company", "role"
+    |------|:--------|------|      ← separator (alignment colons allowed)
+    | 2026-10-02 | Acme \\| Co | PM |   ← `\\|` is a literal pipe inside a cell
+
+Cells keep their column position: an empty cell is "", not skipped. Rows
+shorter than the header are padded with "", longer ones are truncated.
+Rows are split with a plain str.split fast path; only lines containing an
+escaped pipe go through the regex.
+
+TableReader reads any iterable of lines lazily (a file handle works), so a
+caller can stop early or stream a large table. Locating the tables of a file
+is mddoc's job (Document.tables); parse_stats() reads the `- Key: value`
+bullets of a `## Stats` block.
+"""
+import re
+
+ESCAPED_SPLIT = re.compile(r"(?<!\\)\|")
+SEPARATOR_CELL = re.compile(r":?-+:?")
+STAT = re.compile(r"^[ \t]*[-*][ \t]+([^:\n]+):[ \t]*([^\n]*?)[ \t]*$", re.M)
+
+
+def header_key(cell):
+    """Header cell -> row key ("Stage Reached" -> "stage_reached")."""
+    return cell.lower().replace(" ", "_")
+
+
+def split_row(line):
+    """Cells of one table line, stripped, with `\\|` unescaped."""
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    if "\\|" not in line:
+        return list(map(str.strip, line.split("|")))
+    return [cell.strip().replace("\\|", "|") for cell in ESCAPED_SPLIT.split(line)]
+
+
+def is_separator(cells):
+    return all(SEPARATOR_CELL.fullmatch(cell) for cell in cells if cell) and any(cells)
+
+
+class TableReader:
+    """Lazy reader over the lines of one table; iterating yields each row as a list of cells.
+
+    The header (and its separator) is read from the lines unless `headers`
+    is given, which is how appended rows are read without their header.
+    """
+
+    def __init__(self, lines, headers=None):
+        self._lines = iter(lines)
+        self.headers = list(headers) if headers else self._read_header()
+
+    def _read_header(self):
+        for line in self._lines:
+            cells = split_row(line)
+            if any(cells):
+                return [header_key(cell) for cell in cells]
+        return []
+
+    def __iter__(self):
+        width = len(self.headers)
+        if not width:
+            return
+        pad = [""] * width
+        for line in self._lines:
+            if not line.strip():
+                continue
+            cells = split_row(line)
+            if not any(cells) or (cells[0][:1] in "-:" and is_separator(cells)):
+                continue
+            if len(cells) != width:
+                cells = (cells + pad)[:width]
+            yield cells
+
+
+def read_table(lines, headers=None):
+    """(headers, rows as lists of cells) for the lines of one table."""
+    reader = TableReader(lines, headers)
+    return reader.headers, list(reader)
+
+
+def parse_stats(text):
+    """{key: value} from `- Key: value` bullets (keys normalised like headers)."""
+    return {header_key(key.strip()): value for key, value in STAT.findall(text)}
@@ -4,130 +4,139 @@ Scans PIPELINE.md, JOBSEARCH.md, memory/glossary.md, and memory/ directories
 to construct an up-to-date hot cache.
 
 Usage:
-    python scripts/memory_sync.py [workspace_dir]
+    python scripts/memory_sync.py [workspace_dir] [--budget-bytes N | --budget-tokens N] [--no-cache]
+
+Each hot-cache table keeps only its top rows (15 targets, 15 contacts, 20
+terms), ranked rather than taken in file order: targets by stage urgency and
+deadline proximity, contacts by whether they work at an active target and
+how recently they were contacted, terms by how often the chosen rows mention
+them. Selection uses a bounded heap, O(n log k) on large workspaces.
+
+With a budget, CLAUDE.md is packed to fit: tables use compact rows, glossary
+terms replace their spelled-out meanings, empty columns are dropped, repeated
+companies are shown as `"`, and rows are added round-robin across sections
+(best-ranked first) while they fit. The 15/15/20 caps don't apply: every row
+is ranked and the budget decides how many are kept. Bytes per section are
+reported.
 """
 import re
 import sys
+import heapq
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
 
+from dates import parse_date
+from mddoc import load_document
+from mdtable import read_table
+from snapshot import load_snapshot, load_part
+
 STAGES = ["Discovered", "Researching", "Applied", "Phone Screen", "Interview", "Offer", "Declined / Rejected"]
 ACTIVE_STAGES = ["Discovered", "Researching", "Applied", "Phone Screen", "Interview", "Offer"]
-
-
-def parse_pipeline_entries(path):
-    """Extract active entries from PIPELINE.md."""
-    if not path.exists():
-        return []
-    text = path.read_text()
+TITLE_BOLD = re.compile(r"\*\*(.+?)\*\*")
+STAGE_URGENCY = {"Offer": 6, "Interview": 5, "Phone Screen": 4, "Applied": 3, "Researching": 2, "Discovered": 1}
+# glossary.md contacts headers -> contact keys (the hot cache uses Who / At)
+CONTACT_COLUMNS = {"who": "name", "at": "company"}
+WORD = re.compile(r"[\w/&+.-]*\w")
+MAX_TARGETS = 15
+MAX_CONTACTS = 15
+MAX_TERMS = 20
+BYTES_PER_TOKEN = 4  # rough average for English markdown
+EMPTY_CELLS = ("", "—")
+
+
+def active_targets(pipeline_entries):
+    """Active-stage entries (as parsed by pipeline.py) in CLAUDE.md's target shape."""
     entries = []
-    current_stage = None
-
-    for line in text.split("\n"):
-        stage_match = re.match(r"^## (.+)$", line.strip())
-        if stage_match:
-            stage_name = stage_match.group(1).strip()
-            if stage_name in STAGES:
-                current_stage = stage_name
+    for entry in pipeline_entries:
+        if entry["stage"] not in ACTIVE_STAGES:
             continue
-
-        if line.strip().startswith("- [") and current_stage and current_stage in ACTIVE_STAGES:
-            title_match = re.search(r"\*\*(.+?)\*\*", line)
-            title = title_match.group(1) if title_match else "Unknown"
-
-            # Try to extract role and company from "Role — Company" format
-            parts = title.split(" — ")
-            if len(parts) >= 2:
-                role = parts[0].strip()
-                company = parts[1].strip()
-            else:
-                role = title
-                company = "Unknown"
-
-            # Try to extract deadline or next action from fields
-            deadline = "—"
-            next_action = "—"
-            raw_parts = [p.strip() for p in line.split("|")]
-            for p in raw_parts:
-                if p.startswith("Scheduled:") or p.startswith("Deadline:"):
-                    deadline = p.split(":", 1)[1].strip()
-                elif p.startswith("Next:"):
-                    next_action = p.split(":", 1)[1].strip()
-
-            entries.append({
-                "company": company,
-                "role": role,
-                "stage": current_stage,
-                "deadline": deadline,
-                "next_action": next_action,
-            })
+        line = entry["raw"]
+        title_match = TITLE_BOLD.search(line)
+        title = title_match.group(1) if title_match else "Unknown"
+
+        # Try to extract role and company from "Role — Company" format
+        parts = title.split(" — ")
+        if len(parts) >= 2:
+            role = parts[0].strip()
+            company = parts[1].strip()
+        else:
+            role = title
+            company = "Unknown"
+
+        # Try to extract deadline or next action from fields
+        deadline = "—"
+        next_action = "—"
+        raw_parts = [p.strip() for p in line.split("|")]
+        for p in raw_parts:
+            if p.startswith("Scheduled:") or p.startswith("Deadline:"):
+                deadline = p.split(":", 1)[1].strip()
+            elif p.startswith("Next:"):
+                next_action = p.split(":", 1)[1].strip()
+
+        entries.append({
+            "company": company,
+            "role": role,
+            "stage": entry["stage"],
+            "deadline": deadline,
+            "next_action": next_action,
+        })
 
     return entries
 
 
-def parse_profile(path):
-    """Extract key profile info from JOBSEARCH.md."""
+def parse_profile(path, use_cache=True):
+    """Extract key profile info from JOBSEARCH.md (served from the workspace snapshot)."""
+    if use_cache:
+        profile = load_part(path, "profile")
+        return profile["sync"] if profile else {}
     if not path.exists():
         return {}
-    text = path.read_text()
+    doc = load_document(path)
     profile = {"name": "", "floor": "", "notice": "", "optimizing": ""}
 
-    current_section = None
-    for line in text.split("\n"):
-        if line.startswith("## "):
-            current_section = line.strip("# ").strip().lower()
-            continue
-
-        if current_section == "about me" and line.strip() and not line.startswith("<!--"):
+    for line in doc.section_lines("about me"):
+        if line.strip() and not line.startswith("<!--"):
             if not profile["name"]:
                 profile["name"] = line.strip()
 
-        if current_section == "compensation":
-            if "Base floor" in line and "|" in line:
-                parts = line.split("|")
-                if len(parts) >= 3:
-                    profile["floor"] = parts[2].strip()
+    for line in doc.section_lines("compensation"):
+        if "Base floor" in line and "|" in line:
+            parts = line.split("|")
+            if len(parts) >= 3:
+                profile["floor"] = parts[2].strip()
 
-        if current_section == "target":
-            if "Notice" in line and "|" in line:
-                parts = line.split("|")
-                if len(parts) >= 3:
-                    profile["notice"] = parts[2].strip()
+    for line in doc.section_lines("target"):
+        if "Notice" in line and "|" in line:
+            parts = line.split("|")
+            if len(parts) >= 3:
+                profile["notice"] = parts[2].strip()
 
-        if current_section == "preferences":
-            if line.strip().startswith("- ") and not line.startswith("<!--"):
-                if "optimizing" in line.lower() or "Optimizing" in line:
-                    profile["optimizing"] = line.strip().lstrip("- ").strip()
+    for line in doc.section_lines("preferences"):
+        if line.strip().startswith("- ") and not line.startswith("<!--"):
+            if "optimizing" in line.lower() or "Optimizing" in line:
+                profile["optimizing"] = line.strip().lstrip("- ").strip()
 
     return profile
 
 
 def parse_glossary_contacts(path):
-    """Extract contacts from glossary.md."""
+    """Extract contacts from the glossary.md contacts table, mapping its columns by header."""
     if not path.exists():
         return []
-    text = path.read_text()
+    headers, rows = read_table(load_document(path).table_lines(section="contacts"))
     contacts = []
-    in_contacts = False
-
-    for line in text.split("\n"):
-        if "## Contacts" in line:
-            in_contacts = True
-            continue
-        if line.startswith("## ") and in_contacts:
-            in_contacts = False
-            continue
 
-        if in_contacts and "|" in line and not line.strip().startswith("|--") and not "Name" in line.split("|")[1] if len(line.split("|")) > 1 else True:
-            parts = [p.strip() for p in line.split("|") if p.strip()]
-            if len(parts) >= 3:
-                contacts.append({
-                    "name": parts[0],
-                    "company": parts[1],
-                    "role": parts[2],
-                    "last_contact": parts[3] if len(parts) > 3 else "—",
-                    "notes": parts[4] if len(parts) > 4 else "",
-                })
+    for cells in rows:
+        row = {CONTACT_COLUMNS.get(key, key): value for key, value in zip(headers, cells) if value}
+        if row.get("name"):
+            contacts.append({
+                "name": row["name"],
+                "company": row.get("company", ""),
+                "role": row.get("role", ""),
+                "last_contact": row.get("last_contact", "—"),
+                "notes": row.get("notes") or row.get("relationship", ""),
+            })
 
     return contacts
 
@@ -136,19 +145,10 @@ def parse_glossary_terms(path):
     """Extract terms from glossary.md."""
     if not path.exists():
         return []
-    text = path.read_text()
     terms = []
-    in_terms = False
-
-    for line in text.split("\n"):
-        if "## Terms" in line:
-            in_terms = True
-            continue
-        if line.startswith("## ") and in_terms:
-            in_terms = False
-            continue
 
-        if in_terms and "|" in line and not line.strip().startswith("|--"):
+    for line in load_document(path).section_lines("terms"):
+        if "|" in line and not line.strip().startswith("|--"):
             parts = [p.strip() for p in line.split("|") if p.strip()]
             if len(parts) >= 2 and parts[0] != "Term":
                 terms.append({"term": parts[0], "meaning": parts[1]})
@@ -160,35 +160,163 @@ def get_preferences(path):
     """Extract preferences section from JOBSEARCH.md."""
     if not path.exists():
         return []
-    text = path.read_text()
-    lines = []
-    in_prefs = False
+    return [line for line in load_document(path).section_lines("preferences", first_only=True)
+            if line.strip() and not line.startswith("<!--")]
+
+
+def target_score(entry, today):
+    """Stage urgency (10 per stage step) plus up to 30 for a deadline in the next month."""
+    score = STAGE_URGENCY.get(entry["stage"], 0) * 10
+    due = parse_date(entry["deadline"], today)
+    if due is not None:
+        days = (due - today).days
+        if -14 <= days <= 30:
+            score += 30 - max(days, 0)
+    return score
+
+
+def contact_score(contact, today, target_companies):
+    """(works at an active target, -days since last contact); undated contacts rank last."""
+    last = parse_date(contact.get("last_contact"), today, past=True)
+    recency = -(today - last).days if last is not None else float("-inf")
+    return contact["company"].lower() in target_companies, recency
+
+
+def mentions(words, text, term):
+    """Occurrences of `term` in `text`: whole words via the `words` Counter, phrases by substring."""
+    term = term.lower()
+    return text.count(term) if " " in term else words[term]
+
+
+def top_k(items, k, key):
+    """The k best items by `key` in one pass (ties keep file order); k=None ranks them all."""
+    if k is None:
+        return sorted(items, key=key, reverse=True)
+    return heapq.nlargest(k, items, key=key)
+
+
+def section_sizes(text):
+    """Bytes used by each `## ` section of rendered markdown (the title block counts as "Header")."""
+    sizes = {}
+    name = "Header"
     for line in text.split("\n"):
-        if "## Preferences" in line:
-            in_prefs = True
-            continue
-        if line.startswith("## ") and in_prefs:
-            break
-        if in_prefs and line.strip() and not line.startswith("<!--"):
-            lines.append(line)
+        if line.startswith("## "):
+            name = line[3:].strip()
+        sizes[name] = sizes.get(name, 0) + len(line.encode("utf-8")) + 1
+    return sizes
+
+
+def abbreviate(text, abbreviations):
+    for meaning, term in abbreviations:
+        if meaning in text:
+            text = text.replace(meaning, term)
+    return text
+
+
+def compact_row(cells):
+    return "|" + "|".join(cells) + "|"
+
+
+def _render_table(title, columns, rows, company_col):
+    """Compact table lines: empty columns dropped, rows grouped by company with repeats as `"`."""
+    keep = [i for i in range(len(columns)) if any(r[i] not in EMPTY_CELLS for r in rows)]
+    if company_col is not None:
+        first = {}
+        for n, r in enumerate(rows):
+            first.setdefault(r[company_col], n)
+        rows = sorted(rows, key=lambda r: first[r[company_col]])
+    lines = ["", f"## {title}", compact_row(columns[i] for i in keep), compact_row("-" for _ in keep)]
+    previous = None
+    for r in rows:
+        cells = list(r)
+        if company_col is not None:
+            if cells[company_col] == previous:
+                cells[company_col] = '"'
+            previous = r[company_col]
+        lines.append(compact_row(cells[i] for i in keep))
     return lines
 
 
-def rebuild_claude_md(workspace_dir=None):
-    """Rebuild CLAUDE.md from all memory sources."""
+def pack_sections(head, sections, budget):
+    """Lay out `sections` after the `head` lines within `budget` bytes.
+
+    Each section is (title, columns, rows, company_col); columns=None means
+    plain lines. Rows are ranked; one row per section is added per round
+    until a section's next row no longer fits. Returns (lines, rows kept per title).
+    """
+    used = sum(len(line.encode("utf-8")) + 1 for line in head)
+    kept = {title: [] for title, _, _, _ in sections}
+    seen = {title: set() for title, _, _, _ in sections}
+    open_sections = [s for s in sections if s[2]]
+    while open_sections:
+        for section in list(open_sections):
+            title, columns, rows, company_col = section
+            chosen = kept[title]
+            row = rows[len(chosen)]
+            if columns is None:
+                cost = len(row.encode("utf-8")) + 1
+            else:
+                cells = list(row)
+                if company_col is not None and cells[company_col] in seen[title]:
+                    cells[company_col] = '"'
+                cost = len(compact_row(cells).encode("utf-8")) + 1
+            if not chosen:
+                overhead = ["", f"## {title}"]
+                if columns is not None:
+                    overhead += [compact_row(columns), compact_row("-" for _ in columns)]
+                cost += sum(len(line.encode("utf-8")) + 1 for line in overhead)
+            if used + cost > budget:
+                open_sections.remove(section)
+                continue
+            used += cost
+            chosen.append(row)
+            if company_col is not None:
+                seen[title].add(row[company_col])
+            if len(chosen) == len(rows):
+                open_sections.remove(section)
+
+    lines = list(head)
+    for title, columns, _, company_col in sections:
+        if not kept[title]:
+            continue
+        if columns is None:
+            lines.extend(["", f"## {title}", *kept[title]])
+        else:
+            lines.extend(_render_table(title, columns, kept[title], company_col))
+    return lines, {title: len(rows) for title, rows in kept.items()}
+
+
+def rebuild_claude_md(workspace_dir=None, budget_bytes=None, use_cache=True):
+    """Rebuild CLAUDE.md from all memory sources, optionally packed into `budget_bytes`.
+
+    With use_cache=False the sources are parsed without the workspace snapshot.
+    """
     if workspace_dir is None:
         workspace_dir = "."
     workspace = Path(workspace_dir)
 
     now = datetime.now().strftime("%B %d, %Y")
 
-    # Gather data
-    profile = parse_profile(workspace / "JOBSEARCH.md")
-    entries = parse_pipeline_entries(workspace / "PIPELINE.md")
-    glossary_path = workspace / "memory" / "glossary.md"
-    contacts = parse_glossary_contacts(glossary_path)
-    terms = parse_glossary_terms(glossary_path)
-    prefs = get_preferences(workspace / "JOBSEARCH.md")
+    # Gather data (parsed once, shared with the other scripts via memory/.snapshot)
+    snap = load_snapshot(workspace, ["pipeline", "profile", "glossary"], use_cache=use_cache)
+    profile = snap["profile"]["sync"] if snap["profile"] else {}
+    prefs = snap["profile"]["preferences"] if snap["profile"] else []
+    entries = active_targets(snap["pipeline"])
+    contacts = snap["glossary"]["contacts"]
+    terms = snap["glossary"]["terms"]
+
+    # Rank what goes into the hot cache (a budget packs from the full ranking instead of the capped one)
+    today = datetime.now().date()
+    capped = budget_bytes is None
+    top_targets = top_k(entries, MAX_TARGETS if capped else None, key=lambda e: target_score(e, today))
+    target_companies = {e["company"].lower() for e in entries}
+    top_contacts = top_k(contacts, MAX_CONTACTS if capped else None,
+                         key=lambda c: contact_score(c, today, target_companies))
+    mentioned = " ".join(f"{e['company']} {e['role']} {e['next_action']}" for e in top_targets)
+    mentioned += " ".join(f" {c['company']} {c['role']} {c.get('notes', '')}" for c in top_contacts)
+    mentioned = mentioned.lower()
+    words = Counter(WORD.findall(mentioned))
+    top_terms = top_k(terms, MAX_TERMS if capped else None, key=lambda t: mentions(words, mentioned, t["term"]))
 
     # Build CLAUDE.md
     lines = [
@@ -213,31 +341,35 @@ def rebuild_claude_md(workspace_dir=None):
     else:
         lines.append("<!-- Run /job-search:start to fill profile -->")
 
-    # Active targets (cap at 15)
+    if budget_bytes is not None:
+        return _write_budgeted(workspace, now, lines, budget_bytes, top_targets, top_contacts, top_terms,
+                               prefs, terms, len(entries), len(contacts))
+
+    # Active targets
     lines.extend(["", "## Active Targets"])
     lines.append("| Company | Role | Stage | Next Action | Deadline |")
     lines.append("|---------|------|-------|-------------|----------|")
-    for entry in entries[:15]:
+    for entry in top_targets:
         lines.append(
             f"| {entry['company']} | {entry['role']} | {entry['stage']} "
             f"| {entry['next_action']} | {entry['deadline']} |"
         )
 
-    # Key contacts (cap at 15)
+    # Key contacts
     lines.extend(["", "## Key Contacts"])
     lines.append("| Who | At | Role | Last Contact | Notes |")
     lines.append("|-----|-----|------|-------------|-------|")
-    for contact in contacts[:15]:
+    for contact in top_contacts:
         lines.append(
             f"| {contact['name']} | {contact['company']} | {contact['role']} "
             f"| {contact.get('last_contact', '—')} | {contact.get('notes', '')} |"
         )
 
-    # Quick reference terms (cap at 20)
+    # Quick reference terms
     lines.extend(["", "## Quick Reference"])
     lines.append("| Term | Meaning |")
     lines.append("|------|---------|")
-    for term in terms[:20]:
+    for term in top_terms:
         lines.append(f"| {term['term']} | {term['meaning']} |")
 
     # Preferences
@@ -251,7 +383,8 @@ def rebuild_claude_md(workspace_dir=None):
 
     # Write
     claude_md = workspace / "CLAUDE.md"
-    claude_md.write_text("\n".join(lines))
+    text = "\n".join(lines)
+    claude_md.write_text(text)
 
     print(f"CLAUDE.md rebuilt — {now}")
     print(f"  Active targets: {len(entries)}")
@@ -262,9 +395,70 @@ def rebuild_claude_md(workspace_dir=None):
         "targets": len(entries),
         "contacts": len(contacts),
         "terms": len(terms),
+        "bytes": len(text.encode("utf-8")),
+        "sections": section_sizes(text),
+    }
+
+
+def _write_budgeted(workspace, now, head, budget_bytes, targets, contacts, terms, prefs, glossary_terms,
+                    total_targets, total_contacts):
+    """Budget mode of rebuild_claude_md: pack, write and report bytes per section."""
+    abbreviations = sorted(((t["meaning"], t["term"]) for t in glossary_terms
+                            if len(t["meaning"]) > len(t["term"])), key=lambda a: -len(a[0]))
+    sections = [
+        ("Active Targets", ["Company", "Role", "Stage", "Next", "Deadline"],
+         [tuple(abbreviate(v, abbreviations) for v in
+                (e["company"], e["role"], e["stage"], e["next_action"], e["deadline"])) for e in targets], 0),
+        ("Key Contacts", ["Who", "At", "Role", "Last Contact", "Notes"],
+         [tuple(abbreviate(v, abbreviations) for v in
+                (c["name"], c["company"], c["role"], c.get("last_contact", "—"), c.get("notes", "")))
+          for c in contacts], 1),
+        ("Quick Reference", ["Term", "Meaning"], [(t["term"], t["meaning"]) for t in terms], None),
+        ("Preferences", None, list(prefs), None),
+    ]
+    lines, kept = pack_sections(head, sections, budget_bytes)
+    lines.append("")
+    text = "\n".join(lines)
+    (workspace / "CLAUDE.md").write_text(text)
+
+    size = len(text.encode("utf-8"))
+    sizes = section_sizes(text)
+    print(f"CLAUDE.md rebuilt — {now}")
+    print(f"  Size: {size} bytes (~{size // BYTES_PER_TOKEN} tokens) of {budget_bytes} budget")
+    for name, n in sizes.items():
+        rows = next((f" — {kept[name]}/{len(s[2])} rows" for s in sections if s[0] == name), "")
+        print(f"    {name}: {n} bytes{rows}")
+    if size > budget_bytes:
+        print(f"  Warning: header alone exceeds the budget by {size - budget_bytes} bytes")
+
+    return {
+        "targets": total_targets,
+        "contacts": total_contacts,
+        "terms": len(glossary_terms),
+        "bytes": size,
+        "budget": budget_bytes,
+        "sections": sizes,
+        "rows": kept,
     }
 
 
 if __name__ == "__main__":
-    workspace = sys.argv[1] if len(sys.argv) > 1 else None
-    rebuild_claude_md(workspace)
+    workspace = None
+    budget = None
+    use_cache = True
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        if args[i] == "--budget-bytes":
+            budget = int(args[i + 1])
+            i += 2
+        elif args[i] == "--budget-tokens":
+            budget = int(args[i + 1]) * BYTES_PER_TOKEN
+            i += 2
+        elif args[i] == "--no-cache":
+            use_cache = False
+            i += 1
+        else:
+            workspace = args[i]
+            i += 1
+    rebuild_claude_md(workspace, budget, use_cache)
@@ -5,79 +5,152 @@ Usage:
     python scripts/pipeline.py status [pipeline_path]
     python scripts/pipeline.py add [pipeline_path] --company "X" --role "Y" --stage "Discovered" ...
     python scripts/pipeline.py move [pipeline_path] --company "X" --to "Applied"
-    python scripts/pipeline.py followups [pipeline_path]
-    python scripts/pipeline.py export [pipeline_path] --format json
+    python scripts/pipeline.py move [pipeline_path] --id 3f9a01c2 --to "Applied"
+    python scripts/pipeline.py followups [pipeline_path] [--limit N]
+    python scripts/pipeline.py export [pipeline_path] --format json [--include-archive]
+    python scripts/pipeline.py export [pipeline_path] --format ndjson|csv [--fields id,title,stage,url] [--stage Applied,Interview]
+    python scripts/pipeline.py reindex [pipeline_path]
+    python scripts/pipeline.py batch [pipeline_path] --ops ops.jsonl
+    python scripts/pipeline.py compact [pipeline_path]
+    python scripts/pipeline.py archive [pipeline_path] [--days 90]
 
 All commands default to ./PIPELINE.md if no path is given.
+`batch` reads one JSON operation per line ({"op": "add", ...} or
+{"op": "move", ...}; "-" or no --ops reads stdin), applies them all in memory
+and rewrites the file once, atomically.
+
+Writes go through an append-only journal and a writer lock (see
+pipeline_journal.py), so concurrent writers don't lose updates and readers
+never wait. `compact` replays anything an interrupted writer left queued.
+
+Entries carry a hidden `<!-- id:... -->` marker; status, move and followups
+query the SQLite sidecar index (.pipeline-index.sqlite), which is rebuilt
+only when PIPELINE.md changes. `reindex` backfills IDs on older entries.
+
+Moving an entry to Declined / Rejected stamps it `Closed: YYYY-MM-DD`.
+`archive` moves closed entries older than --days (default 90) into
+compressed monthly segments under memory/archive/ (see pipeline_archive.py);
+`export --include-archive` lists them after the live entries.
+
+`export --format ndjson` / `csv` streams one record per line while
+PIPELINE.md is read, instead of building the whole JSON array. `--fields`
+picks the columns: entry keys (id, title, stage, completed, fields, raw) or
+field names (url, comp, location, applied, followup, ...); the raw markdown
+line is only written when asked for. `--stage` keeps only the given stages.
+
+Every add and move is also logged with a timestamp to
+memory/analytics/transitions.jsonl (see transitions.py), which analytics.py
+uses for time-in-stage.
 """
 import re
-import json
+import csv
 import sys
+import json
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
 
-STAGES = ["Discovered", "Researching", "Applied", "Phone Screen", "Interview", "Offer", "Declined / Rejected"]
+from pipeline_index import (ENTRY_LINE, PipelineIndex, ensure_ids, is_entry_line, new_entry_id, split_entry_id,
+                            split_title, with_entry_id)
+from pipeline_archive import append_records, iter_archived
+from pipeline_journal import commit, compact, write_atomic, writer_lock
+from snapshot import load_part
+from transitions import append_events
 
-def parse_pipeline(path):
-    text = Path(path).read_text()
-    entries = []
+STAGES = ["Discovered", "Researching", "Applied", "Phone Screen", "Interview", "Offer", "Declined / Rejected"]
+CLOSED_STAGE = "Declined / Rejected"
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+TITLE_BOLD = re.compile(r"\*\*(.+?)\*\*")
+
+STAGE_HEADER = re.compile(r"## (.+)")
+CHECKBOX = re.compile(r"^- \[[ x]\] ")
+# One scan per field; precedence between kinds is resolved in FIELD_PRECEDENCE order
+FIELD_TOKENS = re.compile(
+    r"(?P<url>^http)|(?P<comp>[₹$])"
+    r"|(?P<location>(?i:remote|bangalore|mumbai|delhi|hybrid|onsite|india))"
+    r"|(?P<dated>^(?:Found|Applied|Scheduled|Closed):)|(?P<followup>^Follow-up:)")
+FIELD_PRECEDENCE = {"url": 0, "comp": 1, "location": 2, "dated": 3, "followup": 4}
+# String fields each journaled op may carry (see apply_ops)
+OP_FIELDS = {
+    "add": ["company", "role", "stage", "comp", "location", "url", "notes", "id"],
+    "move": ["company", "id", "to"],
+}
+# Default --fields for the streaming export formats (no raw line)
+STREAM_FIELDS = {
+    "ndjson": ["id", "title", "stage", "completed", "fields"],
+    "csv": ["id", "title", "stage", "completed", "url", "comp", "location", "found", "applied",
+            "scheduled", "closed", "followup"],
+}
+
+@lru_cache(maxsize=4096)
+def classify_field(p):
+    """Return (key, value) for one `|`-separated entry field (memoized; fields repeat a lot)."""
+    kind = min((m.lastgroup for m in FIELD_TOKENS.finditer(p)), key=FIELD_PRECEDENCE.get, default=None)
+    if kind is None:
+        return "extra", p
+    if kind == "dated":
+        key, val = p.split(":", 1)
+        return key.strip().lower(), val.strip()
+    if kind == "followup":
+        return "followup", p.split(":", 1)[1].strip()
+    return kind, p
+
+def iter_entries(lines):
+    """Yield (line_number, entry) for every pipeline entry in an iterable of lines."""
     current_stage = None
 
-    for line in text.split("\n"):
-        stage_match = re.match(r"^## (.+)$", line.strip())
+    for line_no, line in enumerate(lines, 1):
+        line, entry_id = split_entry_id(line)
+        stripped = line.strip()
+        stage_match = STAGE_HEADER.fullmatch(stripped)
         if stage_match:
             stage_name = stage_match.group(1).strip()
-            if stage_name in STAGES or stage_name == "Declined / Rejected":
+            if stage_name in STAGES:
                 current_stage = stage_name
             continue
 
-        entry_match = re.match(r"^- \[[ x]\] \*?\*?(.+?)(?:\*\*)?(?:\s*\|\s*(.+))?$", line.strip())
-        if entry_match and current_stage:
-            raw = line.strip()
+        if current_stage and ENTRY_LINE.match(stripped):
+            raw = stripped
             parts = [p.strip() for p in raw.split("|")]
-            title_part = parts[0] if parts else raw
 
-            company_role = ""
-            title_clean = re.sub(r"^- \[[ x]\] ", "", title_part)
+            title_clean = CHECKBOX.sub("", parts[0])
             title_clean = title_clean.replace("**", "").replace("~~", "").strip()
 
-            entry = {
+            fields = {}
+            for p in parts[1:]:
+                key, val = classify_field(p)
+                fields[key] = val
+
+            yield line_no, {
+                "id": entry_id,
                 "raw": raw,
                 "title": title_clean,
                 "stage": current_stage,
                 "completed": "[x]" in raw,
-                "fields": {},
+                "fields": fields,
             }
 
-            for p in parts[1:]:
-                p = p.strip()
-                if p.startswith("http"):
-                    entry["fields"]["url"] = p
-                elif "₹" in p or "$" in p:
-                    entry["fields"]["comp"] = p
-                elif any(loc in p.lower() for loc in ["remote", "bangalore", "mumbai", "delhi", "hybrid", "onsite", "india"]):
-                    entry["fields"]["location"] = p
-                elif p.startswith("Found:") or p.startswith("Applied:") or p.startswith("Scheduled:"):
-                    key, val = p.split(":", 1)
-                    entry["fields"][key.strip().lower()] = val.strip()
-                elif p.startswith("Follow-up:"):
-                    entry["fields"]["followup"] = p.split(":", 1)[1].strip()
-                else:
-                    entry["fields"]["extra"] = p
-
-            entries.append(entry)
+def iter_pipeline(path):
+    """Yield entries lazily while reading PIPELINE.md line by line."""
+    with open(path, encoding="utf-8") as f:
+        for _, entry in iter_entries(line.rstrip("\n") for line in f):
+            yield entry
 
-    return entries
+def parse_pipeline(path):
+    return list(iter_pipeline(path))
 
-def get_status(path):
-    entries = parse_pipeline(path)
-    active = [e for e in entries if e["stage"] != "Declined / Rejected"]
+def open_index(path):
+    return PipelineIndex(path, iter_entries)
 
-    stage_counts = {}
-    for e in entries:
-        stage_counts[e["stage"]] = stage_counts.get(e["stage"], 0) + 1
+def get_status(path):
+    with open_index(path) as index:
+        stage_counts = index.stage_counts()
+        actionable = {e["line"]: e for e in index.entries(["Offer"])}
+        actionable.update((e["line"], e) for e in index.entries_with_field("followup"))
+    total_active = sum(n for stage, n in stage_counts.items() if stage != "Declined / Rejected")
 
-    print(f"Pipeline: {len(active)} active opportunities\n")
+    print(f"Pipeline: {total_active} active opportunities\n")
     for stage in STAGES:
         count = stage_counts.get(stage, 0)
         if count > 0:
@@ -89,7 +162,7 @@ def get_status(path):
     # Check for action items
     print("\n⚡ Action needed:")
     action_count = 0
-    for e in entries:
+    for _, e in sorted(actionable.items()):
         if e["stage"] == "Offer":
             action_count += 1
             print(f"  {action_count}. Offer pending: {e['title']} — decision needed")
@@ -100,11 +173,22 @@ def get_status(path):
     if action_count == 0:
         print("  None — pipeline is on track")
 
-    return {"total_active": len(active), "stage_counts": stage_counts}
+    return {"total_active": total_active, "stage_counts": stage_counts}
 
-def add_entry(path, company, role, stage="Discovered", comp=None, location=None, url=None, notes=None):
-    pipeline_path = Path(path)
-    text = pipeline_path.read_text()
+def _insert_under(lines, stage, *entry_lines):
+    stage_header = f"## {stage}"
+    for i, line in enumerate(lines):
+        if line.strip() == stage_header:
+            lines[i + 1:i + 1] = entry_lines
+            return True
+    return False
+
+def _apply_add(lines, company, role, stage="Discovered", comp=None, location=None, url=None, notes=None,
+               entry_id=None):
+    """Insert a new entry line; returns (ok, message, transition event or None)."""
+    # A replayed journal record must not add the same entry twice
+    if entry_id and any(f"id:{entry_id} -->" in line for line in lines):
+        return True, f"Added: {role} — {company} → {stage} (already present)", None
     today = datetime.now().strftime("%b %d")
 
     parts = [f"**{role} — {company}**"]
@@ -116,71 +200,223 @@ def add_entry(path, company, role, stage="Discovered", comp=None, location=None,
         parts.append(f"[link]({url})")
     parts.append(f"Found: {today}")
 
-    entry_line = f"- [ ] {' | '.join(parts)}"
-    if notes:
-        entry_line += f"\n  - {notes}"
-
-    stage_header = f"## {stage}"
-    if stage_header in text:
-        lines = text.split("\n")
-        insert_idx = None
-        for i, line in enumerate(lines):
-            if line.strip() == stage_header:
-                insert_idx = i + 1
-                break
-        if insert_idx is not None:
-            lines.insert(insert_idx, entry_line)
-            pipeline_path.write_text("\n".join(lines))
-            print(f"Added: {role} — {company} → {stage}")
-            return True
-
-    print(f"Error: Stage '{stage}' not found in pipeline")
-    return False
-
-def move_entry(path, search_term, to_stage):
-    pipeline_path = Path(path)
-    text = pipeline_path.read_text()
-    lines = text.split("\n")
-
-    entry_line = None
-    entry_idx = None
+    entry_line = with_entry_id(f"- [ ] {' | '.join(parts)}", entry_id)
+    note_lines = [f"  - {notes}"] if notes else []
+
+    if not _insert_under(lines, stage, entry_line, *note_lines):
+        return False, f"Error: Stage '{stage}' not found in pipeline", None
+    transition = {"id": split_entry_id(entry_line)[1], "title": f"{role} — {company}",
+                  "from": None, "to": stage}
+    return True, f"Added: {role} — {company} → {stage}", transition
+
+def _find_line(lines, search_term="", entry_id=None):
+    """Index of the entry line matching by ID, else exact company, exact role, then substring."""
+    term = (entry_id or search_term or "").strip().lower()
+    if not term:
+        return None
+    found = {}
     for i, line in enumerate(lines):
-        if search_term.lower() in line.lower() and line.strip().startswith("- ["):
-            entry_line = line
-            entry_idx = i
-            break
+        if not is_entry_line(line):
+            continue
+        body, line_id = split_entry_id(line)
+        if line_id == term:
+            return i
+        if entry_id:
+            continue
+        title = TITLE_BOLD.search(body)
+        role, company = split_title(title.group(1) if title else "")
+        if company.lower() == term:
+            found.setdefault(1, i)
+        elif role.lower() == term:
+            found.setdefault(2, i)
+        elif term in body.lower():
+            found.setdefault(3, i)
+    return found[min(found)] if found else None
+
+def _stamp_closed(line, date):
+    """Add a `Closed:` date to an entry line that has none (kept before the ID marker)."""
+    body, entry_id = split_entry_id(line)
+    if "| Closed:" in body:
+        return line
+    body = f"{body.rstrip()} | Closed: {date}"
+    return with_entry_id(body, entry_id) if entry_id else body
+
+def _stage_of(lines, idx):
+    """Stage header the line at `idx` sits under."""
+    for i in range(idx - 1, -1, -1):
+        match = STAGE_HEADER.fullmatch(lines[i].strip())
+        if match and match.group(1).strip() in STAGES:
+            return match.group(1).strip()
+    return None
+
+def _apply_move(lines, idx, to_stage):
+    """Move the entry at `idx` under `to_stage`; returns (ok, message, transition event or None)."""
+    if not any(line.strip() == f"## {to_stage}" for line in lines):
+        return False, f"Error: Stage '{to_stage}' not found", None
+    from_stage = _stage_of(lines, idx)
+    entry_line = with_entry_id(lines.pop(idx))
+    if to_stage == CLOSED_STAGE:
+        entry_line = _stamp_closed(entry_line, datetime.now().strftime("%Y-%m-%d"))
+    _insert_under(lines, to_stage, entry_line)
+    title = TITLE_BOLD.search(entry_line)
+    title = title.group(1) if title else entry_line.strip()
+    transition = None
+    if from_stage != to_stage:
+        transition = {"id": split_entry_id(entry_line)[1], "title": title, "from": from_stage, "to": to_stage}
+    return True, f"Moved '{title}' → {to_stage}", transition
+
+def apply_ops(lines, ops):
+    """Apply add/move operations to PIPELINE.md lines in place; returns one result per op.
+
+    Each op is a dict: {"op": "add", "company", "role", "stage", "comp", "location", "url", "notes", "id"}
+    or {"op": "move", "company" | "id", "to"}. Failed ops are reported and skipped.
+    """
+    results = []
+    for n, op in enumerate(ops, 1):
+        kind = op.get("op")
+        if kind == "add":
+            fields = {k: op.get(k) for k in ["stage", "comp", "location", "url", "notes"] if op.get(k)}
+            ok, message, transition = _apply_add(lines, op.get("company", ""), op.get("role", ""),
+                                                 entry_id=op.get("id"), **fields)
+        elif kind == "move":
+            idx = _find_line(lines, op.get("company", ""), op.get("id"))
+            if idx is None:
+                target = op.get("id") or op.get("company", "")
+                ok, message, transition = False, f"Error: No entry matching '{target}' found", None
+            else:
+                ok, message, transition = _apply_move(lines, idx, op.get("to", "Applied"))
+        else:
+            ok, message, transition = False, f"Error: Unknown operation '{kind}'", None
+        result = {"op": n, "kind": kind, "ok": ok, "message": message}
+        if transition:
+            result["transition"] = transition
+        results.append(result)
+
+    if any(r["ok"] for r in results):
+        ensure_ids(lines)
+    return results
+
+def _log_transitions(path):
+    """on_commit hook: append the stage changes of replayed ops to the transition log."""
+    def on_commit(results):
+        ts = datetime.now().isoformat(timespec="seconds")
+        append_events(path, [{"ts": ts, **r["transition"]}
+                             for batch in results.values() for r in batch if r.get("transition")])
+    return on_commit
+
+class MalformedLine:
+    """Placeholder op for a --ops line that isn't valid JSON (rejected by validate_op)."""
+
+    def __init__(self, line_no, reason):
+        self.line_no, self.reason = line_no, reason
+
+
+def read_ops(handle):
+    """Ops from the JSONL lines of `handle`; unparseable lines become MalformedLine."""
+    ops = []
+    for line_no, line in enumerate(handle, 1):
+        if not line.strip():
+            continue
+        try:
+            ops.append(json.loads(line))
+        except ValueError as exc:
+            ops.append(MalformedLine(line_no, exc))
+    return ops
+
+def validate_op(op):
+    """Why `op` can't be journaled (None if it's well-formed)."""
+    if isinstance(op, MalformedLine):
+        return f"line {op.line_no} is not valid JSON ({op.reason})"
+    if not isinstance(op, dict):
+        return "operation must be a JSON object"
+    if op.get("op") not in OP_FIELDS:
+        return f"Unknown operation '{op.get('op')}'"
+    for key in OP_FIELDS[op["op"]]:
+        if op.get(key) is not None and not isinstance(op[key], str):
+            return f"'{key}' must be a string"
+    return None
+
+def _commit(path, ops):
+    """Journal ops and wait until they are replayed into PIPELINE.md (see pipeline_journal).
+
+    Malformed ops are rejected here, before they reach the journal.
+    """
+    errors = [validate_op(op) for op in ops]
+    valid = [op for op, error in zip(ops, errors) if error is None]
+    for op in valid:
+        if op.get("op") == "add":
+            op.setdefault("id", new_entry_id())
+    applied = iter(commit(path, valid, apply_ops, _log_transitions(path)) if valid else [])
+    results = []
+    for n, (op, error) in enumerate(zip(ops, errors), 1):
+        if error is None:
+            result = next(applied, {"kind": op["op"], "ok": False, "message": "Error: no result recorded"})
+        else:
+            result = {"kind": op.get("op") if isinstance(op, dict) else None, "ok": False,
+                      "message": f"Error: {error}"}
+        results.append({**result, "op": n})
+    return results
 
-    if entry_line is None:
-        print(f"Error: No entry matching '{search_term}' found")
+def add_entry(path, company, role, stage="Discovered", comp=None, location=None, url=None, notes=None):
+    op = {"op": "add", "company": company, "role": role, "stage": stage,
+          "comp": comp, "location": location, "url": url, "notes": notes}
+    result = _commit(path, [op])[0]
+    print(result["message"])
+    return result["ok"]
+
+def move_entry(path, search_term, to_stage, entry_id=None):
+    """Move an entry by ID, or by company/role/substring match (first in file order)."""
+    with open_index(path) as index:
+        entry = index.get(entry_id) if entry_id else index.find(search_term)
+
+    if entry is None:
+        print(f"Error: No entry matching '{entry_id or search_term}' found")
         return False
 
-    lines.pop(entry_idx)
-
-    stage_header = f"## {to_stage}"
-    for i, line in enumerate(lines):
-        if line.strip() == stage_header:
-            lines.insert(i + 1, entry_line)
-            pipeline_path.write_text("\n".join(lines))
-            print(f"Moved '{search_term}' → {to_stage}")
-            return True
-
-    print(f"Error: Stage '{to_stage}' not found")
-    return False
-
-def get_followups(path):
-    entries = parse_pipeline(path)
+    # Resolve to the stable ID so a concurrent writer shifting lines can't retarget the move
+    op = {"op": "move", "to": to_stage}
+    if entry["id"]:
+        op["id"] = entry["id"]
+    else:
+        op["company"] = search_term
+    result = _commit(path, [op])[0]
+    print(result["message"])
+    return result["ok"]
+
+def apply_batch(path, ops):
+    """Apply add/move operations together; PIPELINE.md is written once, atomically."""
+    results = _commit(path, ops)
+    applied = sum(r["ok"] for r in results)
+
+    print(f"Batch: {applied}/{len(results)} operations applied")
+    for r in results:
+        print(f"  {'✓' if r['ok'] else '✗'} {r['op']}. {r['message']}")
+    return results
+
+def compact_journal(path):
+    """Replay operations left in the journal by an interrupted writer."""
+    with writer_lock(path):
+        results = compact(path, apply_ops, _log_transitions(path))
+    print(f"Replayed {sum(len(r) for r in results.values())} pending operations")
+    return results
+
+def get_followups(path, limit=None):
+    """List follow-ups in file order; with `limit`, stop reading after that many."""
     followups = []
-    for e in entries:
-        if e["stage"] == "Applied":
-            if "applied" in e.get("fields", {}):
+    with open_index(path) as index:
+        for e in index.entries(["Applied", "Phone Screen", "Interview", "Offer"]):
+            if limit is not None and len(followups) >= limit:
+                break
+            if e["stage"] == "Applied":
+                if "applied" in e.get("fields", {}):
+                    followups.append({"entry": e["title"], "stage": e["stage"],
+                                      "action": f"Follow up (applied {e['fields']['applied']})"})
+            elif e["stage"] in ["Phone Screen", "Interview"]:
+                followups.append({"entry": e["title"], "stage": e["stage"],
+                                  "action": "Prep needed" if e["stage"] == "Interview" else "Confirm scheduling"})
+            elif e["stage"] == "Offer":
                 followups.append({"entry": e["title"], "stage": e["stage"],
-                                  "action": f"Follow up (applied {e['fields']['applied']})"})
-        elif e["stage"] in ["Phone Screen", "Interview"]:
-            followups.append({"entry": e["title"], "stage": e["stage"],
-                              "action": "Prep needed" if e["stage"] == "Interview" else "Confirm scheduling"})
-        elif e["stage"] == "Offer":
-            followups.append({"entry": e["title"], "stage": e["stage"],
-                              "action": "Decision needed — review offer"})
+                                  "action": "Decision needed — review offer"})
 
     if followups:
         print("Follow-ups due:\n")
@@ -192,15 +428,125 @@ def get_followups(path):
 
     return followups
 
-def export_json(path):
-    entries = parse_pipeline(path)
+def reindex(path):
+    """Backfill entry IDs into PIPELINE.md and rebuild the sidecar index."""
+    pipeline_path = Path(path)
+    with writer_lock(path):
+        lines = pipeline_path.read_text(encoding="utf-8").split("\n")
+        added = ensure_ids(lines)
+        if added:
+            write_atomic(pipeline_path, "\n".join(lines))
+    with open_index(path) as index:
+        total = sum(index.stage_counts().values())
+    print(f"Indexed {total} entries ({added} new IDs)")
+    return {"entries": total, "ids_added": added}
+
+def _entry_block(lines, idx):
+    """Line indices of the entry at `idx` plus its indented note lines."""
+    block = [idx]
+    for j in range(idx + 1, len(lines)):
+        line = lines[j]
+        if not line.strip() or not line[0].isspace() or ENTRY_LINE.match(line.strip()):
+            break
+        block.append(j)
+    return block
+
+def archive_entries(path, days=90):
+    """Move Declined / Rejected entries closed more than `days` days ago to memory/archive/."""
+    pipeline_path = Path(path)
+    today = datetime.now().strftime("%Y-%m-%d")
+    cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+
+    with writer_lock(path):
+        compact(path, apply_ops, _log_transitions(path))
+        lines = pipeline_path.read_text(encoding="utf-8").split("\n")
+        changed = ensure_ids(lines) > 0
+        records, drop, stamped = [], set(), 0
+        for line_no, entry in iter_entries(lines):
+            if entry["stage"] != CLOSED_STAGE:
+                continue
+            idx = line_no - 1
+            closed = entry["fields"].get("closed")
+            if not closed:
+                # Closed before dates were recorded: start the clock now
+                lines[idx] = _stamp_closed(lines[idx], today)
+                stamped += 1
+                continue
+            if not ISO_DATE.fullmatch(closed) or closed > cutoff:
+                continue
+            block = _entry_block(lines, idx)
+            records.append({"closed": closed, "entry": entry, "lines": [lines[i] for i in block]})
+            drop.update(block)
+
+        segments = append_records(path, records) if records else []
+        if records or stamped or changed:
+            write_atomic(pipeline_path, "\n".join(l for i, l in enumerate(lines) if i not in drop))
+
+    if records:
+        print(f"Archived {len(records)} entries closed before {cutoff} → {', '.join(segments)}")
+    else:
+        print(f"Nothing to archive (no entries closed before {cutoff})")
+    if stamped:
+        print(f"Stamped {stamped} closed entries with Closed: {today}; they will be archived after {days} days")
+    return {"archived": len(records), "segments": segments, "stamped": stamped}
+
+def resolve_stages(names):
+    """Stage names from --stage values (case-insensitive, unambiguous prefixes allowed)."""
+    stages = []
+    for name in names:
+        matches = [s for s in STAGES if s.lower() == name.lower()] or \
+                  [s for s in STAGES if s.lower().startswith(name.lower())]
+        if len(matches) != 1:
+            raise ValueError(f"Unknown stage: {name} (choose from {', '.join(STAGES)})")
+        stages.append(matches[0])
+    return stages
+
+def project(entry, fields):
+    """The requested keys of an entry; names that aren't entry keys are looked up in its fields."""
+    return {f: entry[f] if f in entry else entry["fields"].get(f, "") for f in fields}
+
+def export_json(path, include_archive=False, fields=None, stages=None):
+    entries = load_part(path, "pipeline")
+    if include_archive:
+        entries = entries + list(iter_archived(path))
+    if stages:
+        entries = [e for e in entries if e["stage"] in stages]
+    if fields:
+        entries = [project(e, fields) for e in entries]
     output = json.dumps(entries, indent=2)
     print(output)
     return entries
 
+def export_stream(path, fmt="ndjson", fields=None, stages=None, include_archive=False, out=None):
+    """Write entries one record per line (NDJSON or CSV) as PIPELINE.md is parsed; returns the count."""
+    out = out or sys.stdout
+    fields = fields or STREAM_FIELDS[fmt]
+    entries = iter_pipeline(path)
+    if include_archive:
+        entries = chain(entries, iter_archived(path))
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(fields)
+
+        def write(record):
+            writer.writerow(json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else
+                            str(v).lower() if isinstance(v, bool) else v for v in record.values())
+    else:
+        def write(record):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    count = 0
+    for entry in entries:
+        if stages and entry["stage"] not in stages:
+            continue
+        write(project(entry, fields))
+        count += 1
+    out.flush()
+    return count
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python pipeline.py [status|add|move|followups|export] [pipeline_path] [options]")
+        print("Usage: python pipeline.py [status|add|move|followups|export|reindex|batch|compact|archive] [pipeline_path] [options]")
         sys.exit(1)
 
     command = sys.argv[1]
@@ -209,9 +555,41 @@ if __name__ == "__main__":
     if command == "status":
         get_status(path)
     elif command == "followups":
-        get_followups(path)
+        limit = int(sys.argv[sys.argv.index("--limit") + 1]) if "--limit" in sys.argv else None
+        get_followups(path, limit)
     elif command == "export":
-        export_json(path)
+        fmt = sys.argv[sys.argv.index("--format") + 1] if "--format" in sys.argv else "json"
+        fields = None
+        if "--fields" in sys.argv:
+            fields = [f.strip() for f in sys.argv[sys.argv.index("--fields") + 1].split(",") if f.strip()]
+        stages = None
+        if "--stage" in sys.argv:
+            try:
+                stages = resolve_stages(sys.argv[sys.argv.index("--stage") + 1].split(","))
+            except ValueError as exc:
+                print(f"Error: {exc}", file=sys.stderr)
+                sys.exit(1)
+        if fmt in STREAM_FIELDS:
+            export_stream(path, fmt, fields, stages, "--include-archive" in sys.argv)
+        else:
+            export_json(path, "--include-archive" in sys.argv, fields, stages)
+    elif command == "reindex":
+        reindex(path)
+    elif command == "batch":
+        ops_path = sys.argv[sys.argv.index("--ops") + 1] if "--ops" in sys.argv else "-"
+        try:
+            handle = sys.stdin if ops_path == "-" else open(ops_path, encoding="utf-8")
+        except OSError as exc:
+            print(f"Error: can't read --ops file {ops_path} ({exc.strerror})", file=sys.stderr)
+            sys.exit(1)
+        with handle:
+            ops = read_ops(handle)
+        apply_batch(path, ops)
+    elif command == "compact":
+        compact_journal(path)
+    elif command == "archive":
+        days = int(sys.argv[sys.argv.index("--days") + 1]) if "--days" in sys.argv else 90
+        archive_entries(path, days)
     elif command == "add":
         kwargs = {}
         args = sys.argv[2:]
@@ -231,7 +609,8 @@ if __name__ == "__main__":
                   kwargs.get("location"), kwargs.get("url"), kwargs.get("notes"))
     elif command == "move":
         kwargs = {}
-        args = sys.argv[3:] if len(sys.argv) > 3 else []
+        path_given = len(sys.argv) > 2 and not sys.argv[2].startswith("--")
+        args = sys.argv[3:] if path_given else sys.argv[2:]
         i = 0
         while i < len(args):
             if args[i].startswith("--"):
@@ -241,6 +620,6 @@ if __name__ == "__main__":
                 i += 2
             else:
                 i += 1
-        move_entry(path, kwargs.get("company", ""), kwargs.get("to", "Applied"))
+        move_entry(path, kwargs.get("company", ""), kwargs.get("to", "Applied"), kwargs.get("id"))
     else:
         print(f"Unknown command: {command}")
@@ -0,0 +1,101 @@
+"""
+Cold storage for closed PIPELINE.md entries.
+
+`pipeline.py archive` moves Declined / Rejected entries closed more than N
+days ago out of PIPELINE.md into gzip-compressed JSONL segments, one per
+month of closing:
+
+    memory/archive/pipeline-2026-08.jsonl.gz
+    memory/archive/index.json      ← entry count and date range per segment
+
+Each record is the parsed entry (same shape as `pipeline.py export`) plus
+the original markdown lines. Segments are only ever appended to (a new gzip
+member per archive run). A run interrupted before PIPELINE.md was rewritten
+is harmless: the retry skips entry IDs its segment already holds, so the
+index counts stay exact, and readers de-duplicate by ID as well.
+"""
+import os
+import gzip
+import json
+from pathlib import Path
+
+from pipeline_journal import write_atomic
+
+
+def archive_dir_for(pipeline_path):
+    return Path(os.path.abspath(pipeline_path)).parent / "memory" / "archive"
+
+
+def segment_name(closed):
+    """Segment file for an ISO closing date ("2026-08-14" -> pipeline-2026-08.jsonl.gz)."""
+    return f"pipeline-{closed[:7]}.jsonl.gz"
+
+
+def read_index(archive_dir):
+    try:
+        with open(Path(archive_dir) / "index.json", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"segments": {}}
+
+
+def segment_ids(path):
+    """Entry IDs already stored in the segment at `path` (empty if it doesn't exist)."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            return {json.loads(line)["entry"].get("id") for line in handle} - {None, ""}
+    except OSError:
+        return set()
+
+
+def append_records(pipeline_path, records):
+    """Append archived entry records to their monthly segments and update the index.
+
+    Each record needs a "closed" ISO date. Records whose entry ID is already
+    in their segment (left by an interrupted run) are skipped. Segments are
+    fsynced before the index is replaced, and both before the caller rewrites
+    PIPELINE.md.
+    """
+    archive_dir = archive_dir_for(pipeline_path)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    by_segment = {}
+    for record in records:
+        by_segment.setdefault(segment_name(record["closed"]), []).append(record)
+
+    index = read_index(archive_dir)
+    for name, batch in sorted(by_segment.items()):
+        stored = segment_ids(archive_dir / name)
+        batch = [r for r in batch if not r["entry"].get("id") or r["entry"]["id"] not in stored]
+        if not batch:
+            continue
+        payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in batch).encode("utf-8")
+        with open(archive_dir / name, "ab") as f:
+            f.write(gzip.compress(payload))
+            f.flush()
+            os.fsync(f.fileno())
+        closed = sorted(r["closed"] for r in batch)
+        segment = index["segments"].setdefault(name, {"count": 0, "first": closed[0], "last": closed[-1]})
+        segment["count"] += len(batch)
+        segment["first"] = min(segment["first"], closed[0])
+        segment["last"] = max(segment["last"], closed[-1])
+    write_atomic(archive_dir / "index.json", json.dumps(index, indent=2, sort_keys=True))
+    return sorted(by_segment)
+
+
+def iter_archived(pipeline_path):
+    """Yield archived entries oldest segment first, each ID once."""
+    archive_dir = archive_dir_for(pipeline_path)
+    seen = set()
+    for name in sorted(read_index(archive_dir)["segments"]):
+        try:
+            handle = gzip.open(archive_dir / name, "rt", encoding="utf-8")
+        except OSError:
+            continue
+        with handle:
+            for line in handle:
+                record = json.loads(line)
+                if record["entry"].get("id"):
+                    if record["entry"]["id"] in seen:
+                        continue
+                    seen.add(record["entry"]["id"])
+                yield {**record["entry"], "closed": record["closed"], "archived": True}
@@ -0,0 +1,199 @@
+"""
+SQLite sidecar index for PIPELINE.md.
+
+Every entry line carries a hidden, stable ID at the end of the line:
+
+    - [ ] **Senior PM — Razorpay** | ₹45L | Found: Oct 10 <!-- id:3f9a01c2 -->
+
+The index (.pipeline-index.sqlite next to PIPELINE.md) maps IDs, companies,
+roles and stages to line numbers. It is rebuilt only when the markdown's
+content hash changes, so repeated status/move/followups calls stay fast on
+pipelines with thousands of historical entries.
+"""
+import re
+import json
+import sqlite3
+import time
+import secrets
+from pathlib import Path
+
+from disk_cache import file_digest, is_fresh
+
+ENTRY_ID = re.compile(r"\s*<!-- id:([0-9a-f]+) -->\s*$")
+ENTRY_LINE = re.compile(r"- \[[ x]\] .")  # matched against the stripped line
+INDEX_VERSION = "1"
+
+
+def new_entry_id():
+    return secrets.token_hex(4)
+
+
+def split_entry_id(line):
+    """Return (line without the ID marker, ID or None)."""
+    if "<!-- id:" not in line:
+        return line, None
+    match = ENTRY_ID.search(line)
+    if not match:
+        return line, None
+    return line[:match.start()], match.group(1)
+
+
+def is_entry_line(line):
+    return ENTRY_LINE.match(line.strip()) is not None
+
+
+def with_entry_id(line, entry_id=None):
+    """Append an ID marker to an entry line that does not have one yet (other lines are returned as is)."""
+    if ENTRY_ID.search(line) or not is_entry_line(line):
+        return line
+    return f"{line.rstrip()} <!-- id:{entry_id or new_entry_id()} -->"
+
+
+def ensure_ids(lines):
+    """Give every entry line (`- [ ] ...` / `- [x] ...`) an ID in place; returns how many were added."""
+    added = 0
+    for i, line in enumerate(lines):
+        if is_entry_line(line) and not ENTRY_ID.search(line):
+            lines[i] = with_entry_id(line)
+            added += 1
+    return added
+
+
+def split_title(title):
+    """Split "Role — Company" into (role, company)."""
+    parts = title.split(" — ")
+    if len(parts) >= 2:
+        return parts[0].strip(), parts[1].strip()
+    return title.strip(), ""
+
+
+def index_path_for(pipeline_path):
+    return Path(pipeline_path).parent / ".pipeline-index.sqlite"
+
+
+class PipelineIndex:
+    """Line-number index over PIPELINE.md entries, kept in sync by content hash.
+
+    `iter_entries(lines)` must yield (line_number, entry) pairs in file order,
+    where entry has the shape produced by pipeline.parse_pipeline. Rebuilds
+    stream the file, so memory stays flat for very large archives.
+    """
+
+    def __init__(self, pipeline_path, iter_entries):
+        self.path = Path(pipeline_path)
+        self.iter_entries = iter_entries
+        self.db = sqlite3.connect(index_path_for(self.path))
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS entries (
+                line INTEGER PRIMARY KEY,
+                id TEXT,
+                stage TEXT,
+                title TEXT,
+                role TEXT COLLATE NOCASE,
+                company TEXT COLLATE NOCASE,
+                completed INTEGER,
+                raw TEXT,
+                fields TEXT
+            );
+            CREATE INDEX IF NOT EXISTS entries_id ON entries (id);
+            CREATE INDEX IF NOT EXISTS entries_company ON entries (company);
+            CREATE INDEX IF NOT EXISTS entries_role ON entries (role);
+            CREATE INDEX IF NOT EXISTS entries_stage ON entries (stage);
+        """)
+        self.sync()
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _meta(self):
+        return {row["key"]: row["value"] for row in self.db.execute("SELECT key, value FROM meta")}
+
+    def sync(self):
+        """Rebuild the index if PIPELINE.md changed; returns True when a rebuild happened."""
+        st = self.path.stat()
+        stamp = f"{st.st_mtime_ns}:{st.st_size}"
+        meta = self._meta()
+        if meta.get("version") == INDEX_VERSION and meta.get("stamp"):
+            mtime_ns, size = map(int, meta["stamp"].split(":"))
+            stored = {"mtime_ns": mtime_ns, "size": size, "sha256": meta.get("sha256"),
+                      "stamped_ns": int(meta.get("stamped_ns", 0))}
+            if is_fresh(self.path, stored, st):
+                if stored["stamped_ns"] != int(meta.get("stamped_ns", 0)):
+                    with self.db:
+                        self.db.executemany("REPLACE INTO meta VALUES (?, ?)", [
+                            ("stamp", stamp), ("stamped_ns", str(stored["stamped_ns"]))])
+                return False
+
+        stamped_ns = time.time_ns()
+        digest = file_digest(self.path)
+
+        def rows(f):
+            for line_no, entry in self.iter_entries(line.rstrip("\n") for line in f):
+                role, company = split_title(entry["title"])
+                yield (line_no, entry.get("id"), entry["stage"], entry["title"], role, company,
+                       int(entry["completed"]), entry["raw"], json.dumps(entry["fields"]))
+
+        with self.db, open(self.path, encoding="utf-8") as f:
+            self.db.execute("DELETE FROM entries")
+            self.db.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows(f))
+            self.db.executemany("REPLACE INTO meta VALUES (?, ?)", [
+                ("version", INDEX_VERSION), ("stamp", stamp), ("sha256", digest), ("stamped_ns", str(stamped_ns))])
+        return True
+
+    @staticmethod
+    def _entry(row):
+        return {
+            "id": row["id"],
+            "line": row["line"],
+            "title": row["title"],
+            "stage": row["stage"],
+            "completed": bool(row["completed"]),
+            "raw": row["raw"],
+            "fields": json.loads(row["fields"]),
+        }
+
+    def entries(self, stages=None):
+        """Lazily yield entries in file order, optionally restricted to `stages`."""
+        if stages:
+            marks = ",".join("?" * len(stages))
+            rows = self.db.execute(f"SELECT * FROM entries WHERE stage IN ({marks}) ORDER BY line", list(stages))
+        else:
+            rows = self.db.execute("SELECT * FROM entries ORDER BY line")
+        for row in rows:
+            yield self._entry(row)
+
+    def entries_with_field(self, name):
+        """Entries whose parsed fields include `name`, in file order."""
+        rows = self.db.execute("SELECT * FROM entries WHERE fields LIKE ? ORDER BY line",
+                               (f'%{json.dumps(name)}:%',))
+        return [e for e in map(self._entry, rows) if name in e["fields"]]
+
+    def stage_counts(self):
+        return {r["stage"]: r["n"] for r in self.db.execute(
+            "SELECT stage, COUNT(*) AS n FROM entries GROUP BY stage")}
+
+    def get(self, entry_id):
+        row = self.db.execute("SELECT * FROM entries WHERE id = ?", (entry_id,)).fetchone()
+        return self._entry(row) if row else None
+
+    def find(self, search_term):
+        """First entry matching by ID, then exact company, then exact role, then substring."""
+        term = search_term.strip()
+        if not term:
+            return None
+        for sql in ("SELECT * FROM entries WHERE id = ? ORDER BY line LIMIT 1",
+                    "SELECT * FROM entries WHERE company = ? ORDER BY line LIMIT 1",
+                    "SELECT * FROM entries WHERE role = ? ORDER BY line LIMIT 1",
+                    "SELECT * FROM entries WHERE instr(lower(raw), lower(?)) ORDER BY line LIMIT 1"):
+            row = self.db.execute(sql, (term,)).fetchone()
+            if row:
+                return self._entry(row)
+        return None
@@ -0,0 +1,169 @@
+"""
+Write-ahead journal and locking for concurrent PIPELINE.md writers.
+
+The agent, a scheduled sync and the dashboard may all mutate PIPELINE.md at
+once. Writers never edit the markdown directly:
+
+1. Append their operations to .PIPELINE.md.journal (a short append lock).
+2. Take the writer lock (.PIPELINE.md.lock). Whoever holds it replays every
+   pending journal record into the markdown, writes it once (temp file +
+   fsync + rename) and records per-record results in .PIPELINE.md.receipts.
+3. Writers whose records were already replayed by someone else just pick up
+   their receipt — a burst of updates costs one fsync.
+
+Readers take no locks: the rename means they always see a complete file.
+Locking uses fcntl and is skipped on platforms without it.
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import tempfile
+from pathlib import Path
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single-writer behaviour as before
+    fcntl = None
+
+RECEIPT_TTL = 600  # seconds a receipt is kept for writers still waiting on the lock
+
+
+def _sidecar(path, suffix):
+    path = Path(path)
+    return path.parent / f".{path.name}.{suffix}"
+
+
+def write_atomic(path, text):
+    """Replace `path` with `text` via a temp file + rename, so readers never see a partial write."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+@contextmanager
+def _flocked(handle, exclusive=True):
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    try:
+        yield handle
+    finally:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def writer_lock(path):
+    """Exclusive writer lock for PIPELINE.md (blocks other writers, never readers)."""
+    with open(_sidecar(path, "lock"), "a") as handle, _flocked(handle):
+        yield
+
+
+def _append_record(path, record):
+    with open(_sidecar(path, "journal"), "a", encoding="utf-8") as handle, _flocked(handle):
+        handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        handle.flush()
+
+
+def _read_receipts(path):
+    receipts = {}
+    try:
+        with open(_sidecar(path, "receipts"), encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    receipt = json.loads(line)
+                except ValueError:
+                    continue
+                receipts[receipt["txn"]] = receipt
+    except OSError:
+        pass
+    return receipts
+
+
+def _write_receipts(path, results):
+    cutoff = time.time() - RECEIPT_TTL
+    receipts = {k: v for k, v in _read_receipts(path).items() if v["ts"] >= cutoff}
+    now = time.time()
+    for txn, result in results.items():
+        receipts[txn] = {"txn": txn, "ts": now, "results": result}
+    write_atomic(_sidecar(path, "receipts"),
+                 "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in receipts.values()))
+
+
+def compact(path, apply_ops, on_commit=None):
+    """Replay pending journal records into PIPELINE.md. Caller must hold writer_lock.
+
+    `apply_ops(lines, ops)` mutates the markdown lines in place and returns a
+    list of per-op results (dicts with an "ok" key); a record it raises on is
+    rolled back, answered with failed results and dropped. `on_commit(results)`, if
+    given, runs once the markdown is written. Returns {txn: results}.
+    """
+    journal = _sidecar(path, "journal")
+    if not journal.exists():
+        return {}
+    with open(journal, "rb") as handle, _flocked(handle):
+        data = handle.read()
+    consumed = data.rfind(b"\n") + 1  # a torn final line is left for the next pass
+    records = []
+    for raw in data[:consumed].splitlines():
+        try:
+            records.append(json.loads(raw))
+        except ValueError:
+            continue
+    if not records:
+        return {}
+
+    pipeline_path = Path(path)
+    lines = pipeline_path.read_text(encoding="utf-8").split("\n")
+    results = {}
+    for record in records:
+        before = list(lines)
+        try:
+            results[record["txn"]] = apply_ops(lines, record["ops"])
+        except Exception as exc:
+            # A record that can't be applied is answered with a failed receipt and
+            # dropped below like the rest, so it can't block every later writer
+            lines[:] = before
+            ops = record.get("ops") if isinstance(record, dict) else None
+            count = len(ops) if isinstance(ops, list) and ops else 1
+            message = f"Error: journal record could not be applied ({type(exc).__name__}: {exc})"
+            failed = [{"op": n, "kind": None, "ok": False, "message": message} for n in range(1, count + 1)]
+            if isinstance(record, dict) and isinstance(record.get("txn"), str):
+                results[record["txn"]] = failed
+    if any(res.get("ok") for batch in results.values() for res in batch):
+        write_atomic(pipeline_path, "\n".join(lines))
+        if on_commit is not None:
+            on_commit(results)
+    _write_receipts(path, results)
+
+    # Drop only what was replayed; records appended meanwhile stay queued
+    with open(journal, "r+b") as handle, _flocked(handle):
+        rest = handle.read()[consumed:]
+        handle.seek(0)
+        handle.write(rest)
+        handle.truncate()
+    return results
+
+
+def commit(path, ops, apply_ops, on_commit=None):
+    """Journal `ops`, then make sure they are replayed; returns their per-op results."""
+    txn = uuid.uuid4().hex
+    _append_record(path, {"txn": txn, "ts": time.time(), "ops": ops})
+    with writer_lock(path):
+        receipt = _read_receipts(path).get(txn)
+        if receipt is not None:
+            return receipt["results"]
+        return compact(path, apply_ops, on_commit).get(txn, [])
@@ -0,0 +1,144 @@
+"""
+Shared parsed-workspace snapshot for all scripts.
+
+PIPELINE.md, JOBSEARCH.md and memory/glossary.md are parsed once and kept
+in memory/.snapshot, a marshal-encoded file holding one part per source:
+
+    snap = load_snapshot(workspace, ["pipeline", "glossary"])
+    entries = load_part("PIPELINE.md", "pipeline")
+
+Each part is stamped with its source's path, mtime, size and SHA-256. A
+matching mtime/size is trusted (unless the write was too recent to tell);
+otherwise the content hash decides whether just that part is re-parsed.
+Workspaces without a memory/ directory are parsed every time, as before, and
+so is everything with use_cache=False (the snapshot is then neither read nor
+written).
+"""
+import os
+import marshal
+from pathlib import Path
+
+from disk_cache import file_stamp, is_fresh
+
+SNAPSHOT_FORMAT = 6  # 6: parts carry a disk_cache.file_stamp()
+SNAPSHOT_NAME = ".snapshot"
+
+SOURCES = {
+    "pipeline": "PIPELINE.md",
+    "profile": "JOBSEARCH.md",
+    "glossary": "memory/glossary.md",
+}
+
+
+# Parsers live with the scripts that own the format; imported lazily because
+# those scripts import this module.
+
+def _parse_pipeline(path):
+    from pipeline import iter_pipeline
+    return list(iter_pipeline(path))
+
+
+def _parse_profile(path):
+    from match_score import parse_profile as match_profile
+    from memory_sync import get_preferences, parse_profile as sync_profile
+    return {
+        "match": match_profile(path),
+        "sync": sync_profile(path, use_cache=False),
+        "preferences": get_preferences(path),
+    }
+
+
+def _parse_glossary(path):
+    from memory_sync import parse_glossary_contacts, parse_glossary_terms
+    return {"contacts": parse_glossary_contacts(path), "terms": parse_glossary_terms(path)}
+
+
+PARSERS = {"pipeline": _parse_pipeline, "profile": _parse_profile, "glossary": _parse_glossary}
+
+# Value of a part whose source file does not exist
+EMPTY = {"pipeline": [], "profile": None, "glossary": {"contacts": [], "terms": []}}
+
+
+def snapshot_path_for(workspace):
+    return Path(workspace) / "memory" / SNAPSHOT_NAME
+
+
+def _read_snapshot(path):
+    try:
+        data = marshal.loads(path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    if not isinstance(data, dict) or data.get("format") != (SNAPSHOT_FORMAT, marshal.version):
+        return {}
+    return data.get("parts", {})
+
+
+def _write_snapshot(path, parts):
+    try:
+        tmp = path.with_name(f"{path.name}.tmp{os.getpid()}")
+        tmp.write_bytes(marshal.dumps({"format": (SNAPSHOT_FORMAT, marshal.version), "parts": parts}))
+        os.replace(tmp, path)
+    except (OSError, ValueError):
+        pass  # the parts were parsed anyway; the next run just parses them again
+
+
+def _fresh(stored, source, st):
+    """True if `stored` still describes `source`; refreshes its stamp when only the mtime moved."""
+    if stored is None or stored["source"] != source:
+        return False
+    return is_fresh(source, stored, st)
+
+
+def load_snapshot(workspace=".", parts=None, sources=None, use_cache=True):
+    """Return {part: parsed value} for `parts` (default: all), re-parsing only changed files.
+
+    `sources` overrides the file used for a part, e.g. {"pipeline": "old/PIPELINE.md"}
+    (relative paths are taken from `workspace`).
+    """
+    workspace = Path(workspace)
+    snap_path = snapshot_path_for(workspace)
+    persist = use_cache and snap_path.parent.is_dir()
+    stored = _read_snapshot(snap_path) if persist else {}
+    sources = {**SOURCES, **(sources or {})}
+
+    result = {}
+    dirty = False
+    for part in parts or SOURCES:
+        source = os.path.abspath(workspace / sources[part])
+        try:
+            st = os.stat(source)
+        except OSError:
+            result[part] = EMPTY[part]
+            dirty |= stored.pop(part, None) is not None
+            continue
+
+        entry = stored.get(part)
+        stamped_ns = entry and entry["stamped_ns"]
+        if _fresh(entry, source, st):
+            dirty |= entry["stamped_ns"] != stamped_ns
+        else:
+            stamp = file_stamp(source, st) if persist else {"mtime_ns": st.st_mtime_ns, "size": st.st_size,
+                                                            "sha256": "", "stamped_ns": 0}
+            entry = stored[part] = {"source": source, **stamp, "value": PARSERS[part](Path(source))}
+            dirty = True
+        result[part] = entry["value"]
+
+    if persist and dirty:
+        _write_snapshot(snap_path, stored)
+    return result
+
+
+def workspace_for(path, part):
+    """Workspace directory for a source file passed on the command line."""
+    path = Path(os.path.abspath(path))
+    default = Path(SOURCES[part])
+    if path.parts[-len(default.parts):] == default.parts:
+        return path.parents[len(default.parts) - 1]
+    return path.parent
+
+
+def load_part(path, part, use_cache=True):
+    """Parsed contents of one workspace file, e.g. load_part("PIPELINE.md", "pipeline")."""
+    path = Path(os.path.abspath(path))
+    workspace = workspace_for(path, part)
+    return load_snapshot(workspace, [part], {part: path}, use_cache)[part]
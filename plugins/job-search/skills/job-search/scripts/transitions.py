@@ -0,0 +1,128 @@
+"""
+Stage-transition log for PIPELINE.md and time-in-stage statistics.
+
+pipeline.py appends one JSON line per successful add or move to
+memory/analytics/transitions.jsonl (never rewritten):
+
+    {"ts": "2026-10-18T09:12:03", "id": "3f9a01c2", "title": "Senior PM — Razorpay", "from": "Applied", "to": "Interview"}
+
+time_in_stage() folds the log into per-stage histograms of whole hours spent
+in a stage, kept in memory/.cache/transitions.json with the byte offset read
+so far. Each run only reads events appended since the last one; if the log
+was truncated or rewritten it is re-read from the start.
+"""
+import os
+import json
+from datetime import datetime
+from pathlib import Path
+
+from pipeline_journal import write_atomic
+
+STAGES = ["Discovered", "Researching", "Applied", "Phone Screen", "Interview", "Offer", "Declined / Rejected"]
+STATE_FORMAT = 1
+TAIL_BYTES = 64  # bytes before the read offset remembered to detect rewrites
+
+
+def log_path_for(workspace):
+    return Path(workspace) / "memory" / "analytics" / "transitions.jsonl"
+
+
+def append_events(pipeline_path, events):
+    """Append transition events; skipped (returns False) in workspaces without memory/."""
+    workspace = Path(os.path.abspath(pipeline_path)).parent
+    if not events or not (workspace / "memory").is_dir():
+        return False
+    log = log_path_for(workspace)
+    log.parent.mkdir(exist_ok=True)
+    with open(log, "a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events))
+        f.flush()
+        os.fsync(f.fileno())
+    return True
+
+
+def _empty_state(source):
+    return {"format": STATE_FORMAT, "source": source, "offset": 0, "tail": "", "open": {}, "hours": {}}
+
+
+def _fold(state, event):
+    """Close the entry's current stay (if its start was logged) and open the next one."""
+    ts = datetime.fromisoformat(event["ts"]).timestamp()
+    key = event.get("id") or event.get("title")
+    current = state["open"].get(key)
+    if current is not None and current[0] == event.get("from"):
+        hours = str(max(0, round((ts - current[1]) / 3600)))
+        histogram = state["hours"].setdefault(current[0], {})
+        histogram[hours] = histogram.get(hours, 0) + 1
+    if event.get("to"):
+        state["open"][key] = [event["to"], ts]
+
+
+def percentile(histogram, q):
+    """Nearest-rank percentile of a {value: count} histogram."""
+    total = sum(histogram.values())
+    rank = max(1, -(-total * q // 100))
+    seen = 0
+    for value in sorted(histogram, key=int):
+        seen += histogram[value]
+        if seen >= rank:
+            return int(value)
+    return 0
+
+
+def time_in_stage(workspace, use_cache=True):
+    """{stage: {"count", "median_days", "p90_days", "current"}} from the transition log."""
+    log = log_path_for(workspace)
+    if not log.exists():
+        return {}
+    source = os.path.abspath(log)
+    cache_file = Path(workspace) / "memory" / ".cache" / "transitions.json"
+    state = None
+    if use_cache:
+        try:
+            state = json.loads(cache_file.read_text())
+        except (OSError, ValueError):
+            state = None
+    if not state or state.get("format") != STATE_FORMAT or state.get("source") != source:
+        state = _empty_state(source)
+
+    with open(log, "rb") as f:
+        offset = state["offset"]
+        f.seek(max(0, offset - TAIL_BYTES))
+        if f.read(min(offset, TAIL_BYTES)).hex() != state["tail"]:
+            state = _empty_state(source)
+            offset = 0
+        f.seek(offset)
+        data = f.read()
+        consumed = data.rfind(b"\n") + 1  # a partly written last line waits for the next run
+        for line in data[:consumed].splitlines():
+            try:
+                _fold(state, json.loads(line))
+            except (ValueError, KeyError, TypeError):
+                continue
+        state["offset"] = offset + consumed
+        f.seek(max(0, state["offset"] - TAIL_BYTES))
+        state["tail"] = f.read(min(state["offset"], TAIL_BYTES)).hex()
+
+    if consumed:
+        try:
+            cache_file.parent.mkdir(exist_ok=True)
+            write_atomic(cache_file, json.dumps(state))
+        except OSError:
+            pass  # the next call folds these events again from the old offset
+
+    current = {}
+    for stage, _ in state["open"].values():
+        current[stage] = current.get(stage, 0) + 1
+    stats = {}
+    for stage in STAGES:
+        histogram = state["hours"].get(stage, {})
+        if not histogram and not current.get(stage):
+            continue
+        stats[stage] = {
+            "count": sum(histogram.values()),
+            "median_days": round(percentile(histogram, 50) / 24, 1) if histogram else None,
+            "p90_days": round(percentile(histogram, 90) / 24, 1) if histogram else None,
+            "current": current.get(stage, 0),
+        }
+    return stats
@@ -0,0 +1,107 @@
+"""
+Rolling-window funnel trends from the analytics aggregates.
+
+analytics.py keeps a per-day count of tracker rows (applications,
+interviews, offers) in its incremental aggregates, so appending a row only
+bumps one day bucket. Weekly, monthly and trailing-N-day windows are summed
+from those day buckets with prefix sums; history is never rescanned.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+from dates import parse_date
+
+SERIES = ["applications", "interviews", "offers"]
+PERIODS = ["weekly", "monthly", "trailing"]
+
+
+def day_buckets(date_counts, today):
+    """{date string: rows} -> sorted [(date, rows)]; unparseable dates are dropped."""
+    days = {}
+    for text, n in date_counts.items():
+        day = parse_date(text, today, past=True)
+        if day is not None:
+            days[day] = days.get(day, 0) + n
+    return sorted(days.items())
+
+
+def windows(period, count, today, days=30):
+    """The last `count` windows as (label, first day, last day), oldest first."""
+    result = []
+    if period == "weekly":
+        start = today - timedelta(days=today.weekday())
+        for _ in range(count):
+            year, week, _ = start.isocalendar()
+            result.append((f"{year}-W{week:02d}", start, start + timedelta(days=6)))
+            start -= timedelta(days=7)
+    elif period == "monthly":
+        start = today.replace(day=1)
+        for _ in range(count):
+            end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+            result.append((start.strftime("%Y-%m"), start, end))
+            start = (start - timedelta(days=1)).replace(day=1)
+    else:
+        end = today
+        for _ in range(count):
+            start = end - timedelta(days=days - 1)
+            result.append((f"{start:%b %d}–{end:%b %d}", start, end))
+            end = start - timedelta(days=1)
+    return result[::-1]
+
+
+class WindowCounter:
+    """Row counts over any date range in O(log days), via prefix sums over day buckets."""
+
+    def __init__(self, buckets):
+        self.days = [day for day, _ in buckets]
+        self.totals = [0]
+        for _, n in buckets:
+            self.totals.append(self.totals[-1] + n)
+
+    def count(self, first, last):
+        return self.totals[bisect_right(self.days, last)] - self.totals[bisect_left(self.days, first)]
+
+
+def rate(numerator, denominator):
+    return round(numerator / denominator * 100, 1) if denominator else None
+
+
+def trend_series(date_counts, period="weekly", count=12, today=None, days=30):
+    """Per-window counts and conversion rates, oldest first.
+
+    `date_counts` maps each of SERIES to its {date string: rows} counts.
+    """
+    today = today or date.today()
+    counters = {name: WindowCounter(day_buckets(date_counts.get(name, {}), today)) for name in SERIES}
+    series = []
+    for label, first, last in windows(period, count, today, days):
+        point = {"period": label, "start": first.isoformat(), "end": last.isoformat()}
+        for name in SERIES:
+            point[name] = counters[name].count(first, last)
+        point["app_to_interview"] = rate(point["interviews"], point["applications"])
+        point["interview_to_offer"] = rate(point["offers"], point["interviews"])
+        series.append(point)
+    return series
+
+
+def render_markdown(series, period, generated):
+    def pct(value):
+        return "—" if value is None else f"{value:.0f}%"
+
+    heading = {"weekly": "Week", "monthly": "Month"}.get(period, "Window")
+    report = f"# Job Search Trends ({period})\n\n> Generated: {generated}\n\n"
+    report += f"| {heading} | Applications | Interviews | Offers | App → Interview | Interview → Offer |\n"
+    report += "|------|--------------|------------|--------|-----------------|-------------------|\n"
+    for p in series:
+        report += (f"| {p['period']} | {p['applications']} | {p['interviews']} | {p['offers']} "
+                   f"| {pct(p['app_to_interview'])} | {pct(p['interview_to_offer'])} |\n")
+
+    if len(series) >= 2:
+        last, prev = series[-1], series[-2]
+        report += "\n## Direction\n"
+        report += f"- Applications: {last['applications']} vs {prev['applications']} the window before\n"
+        if last["app_to_interview"] is not None and prev["app_to_interview"] is not None:
+            change = last["app_to_interview"] - prev["app_to_interview"]
+            word = "improving" if change > 0 else "slipping" if change < 0 else "flat"
+            report += f"- Interview rate {word}: {pct(last['app_to_interview'])} vs {pct(prev['app_to_interview'])}\n"
+    return report